@@ -16,23 +16,58 @@ export default function AdminDashboard() {
     }
   }, [navigate]);
 
+  // 🔥 LIVE UPDATES - the backend pushes only what changed (SSE)
   useEffect(() => {
+    const source = new EventSource(`http://${window.location.hostname}:5000/api/live/events`);
+    const seen = {};
+
+    const merge = (e) => {
+      const change = JSON.parse(e.data);
+      seen[change.email] = Date.now();
+      setUsers(prev => {
+        const exists = prev.some(u => u.email === change.email);
+        return exists
+          ? prev.map(u => (u.email === change.email ? { ...u, ...change } : u))
+          : [...prev, change];
+      });
+    };
+
+    source.addEventListener("snapshot", (e) => {
+      const data = JSON.parse(e.data);
+      data.forEach(u => { seen[u.email] = Date.now(); });
+      setUsers(data);
+    });
+    source.addEventListener("live", merge);
+    source.addEventListener("heartbeat", merge);
+    source.addEventListener("frame", merge);
+    source.addEventListener("login", (e) => {
+      const login = JSON.parse(e.data);
+      setAllUsers(prev => [login, ...prev]);
+    });
+
+    // No heartbeat for 20s -> candidate disconnected
     const interval = setInterval(() => {
-      fetch(`http://${window.location.hostname}:5000/api/live`)
-        .then(res => res.json())
-        .then(data => setUsers(data))
-        .catch(err => console.error(err));
-    }, 4000);
+      const cutoff = Date.now() - 20000;
+      setUsers(prev => prev.map(u =>
+        u.isActive && (seen[u.email] || 0) < cutoff ? { ...u, isActive: false, image: null } : u
+      ));
+    }, 5000);
 
-    return () => clearInterval(interval);
+    return () => {
+      source.close();
+      clearInterval(interval);
+    };
   }, []);
   useEffect(() => {
-    const interval = setInterval(() => {
+    // Full login history now and then - unchanged lists come back as 304 (ETag)
+    const load = () => {
       fetch(`http://${window.location.hostname}:5000/api/all-users`)
         .then(res => res.json())
         .then(data => setAllUsers(data))
         .catch(err => console.error(err));
-    }, 3000);
+    };
+    load();
+    const interval = setInterval(load, 30000);
 
     return () => clearInterval(interval);
   }, []);
@@ -31,22 +31,22 @@ fetch(`http://${window.location.hostname}:5000/api/live`, {
   }, []);
 
 const captureFrame = () => {
-  const imageSrc = webcamRef.current.getScreenshot();
+  const canvas = webcamRef.current && webcamRef.current.getCanvas();
 
-  if (!imageSrc) return;
+  if (!canvas) return;
 
-  // ✅ 1. SEND FRAME TO BACKEND (SAVE IMAGE)
-  fetch(`http://${window.location.hostname}:5000/api/upload-frame`, {
-    method: "POST",
-    headers: {
-      "Content-Type": "application/json"
-    },
-    body: JSON.stringify({
-      image: imageSrc,
-      email: email,
-      name: "Candidate"
-    })
-  });
+  // ✅ 1. SEND FRAME TO BACKEND (SAVE IMAGE) - raw JPEG bytes, metadata in the query string
+  canvas.toBlob((frame) => {
+    if (!frame) return;
+    const params = new URLSearchParams({ email: email, name: "Candidate" });
+    fetch(`http://${window.location.hostname}:5000/api/frames?${params}`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "image/jpeg"
+      },
+      body: frame
+    });
+  }, "image/jpeg", 0.8);
 
   // ✅ 2. ANALYZE FRAME (CHEATING DETECTION)
   
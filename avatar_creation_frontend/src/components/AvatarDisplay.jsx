@@ -170,34 +170,56 @@ const AvatarDisplay = () => {
     return () => clearInterval(interval);
   }, [interviewStarted]);
   useEffect(() => {
-    if (!interviewStarted || isStopped || showResult) return;
-
-    const checkStatus = setInterval(async () => {
-      try {
-        const res = await fetch(`${API_BASE_URL}/api/live`);
-        const data = await res.json();
-
-        const me = data.find(u => u.email === user?.email);
-
-        if (!me) return; // safety
-
-        if (me?.isCompleted && me?.status === "Stopped by Admin") {
-          alert("Your interview is stopped by admin");
-
-          setIsStopped(true);
-          setInterviewStarted(false);
-          setShowResult(true);
-
-          clearInterval(checkStatus);
-
-          navigate("/login");
+    if (!interviewStarted || isStopped || showResult || !user?.email) return;
+
+    let cancelled = false;
+    let etag = null;
+    const controller = new AbortController();
+    const pause = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+    // Long-poll this candidate's status only: the server holds the request
+    // until it changes (e.g. stopped by admin) or 25s pass (304)
+    const watchStatus = async () => {
+      while (!cancelled) {
+        try {
+          const res = await fetch(
+            `${API_BASE_URL}/api/live/${encodeURIComponent(user.email)}?wait=25`,
+            { headers: etag ? { "If-None-Match": etag } : {}, signal: controller.signal }
+          );
+
+          if (res.status === 304) continue;
+          if (!res.ok) {
+            await pause(5000); // not registered yet - safety
+            continue;
+          }
+
+          etag = res.headers.get("ETag");
+          const me = await res.json();
+
+          if (me?.isCompleted && me?.status === "Stopped by Admin") {
+            alert("Your interview is stopped by admin");
+
+            setIsStopped(true);
+            setInterviewStarted(false);
+            setShowResult(true);
+
+            navigate("/login");
+            return;
+          }
+        } catch (error) {
+          if (cancelled) return;
+          console.error("Error checking status:", error);
+          await pause(5000);
         }
-      } catch (error) {
-        console.error("Error checking status:", error);
       }
-    }, 5000);
+    };
 
-    return () => clearInterval(checkStatus);
+    watchStatus();
+
+    return () => {
+      cancelled = true;
+      controller.abort();
+    };
   }, [interviewStarted,showResult]);
   useEffect(() => {
     const handleTabClose = async () => {
@@ -482,19 +504,22 @@ const finishInterview = async () => {
   const captureAndSend = async () => {
     if (!webcamRef.current || isProcessing) return;
 
-    const imageSrc = webcamRef.current.getScreenshot();
+    const canvas = webcamRef.current.getCanvas();
+    if (!canvas) return;
+
+    // Raw JPEG bytes - no base64 / JSON overhead
+    const frame = await new Promise((resolve) => canvas.toBlob(resolve, "image/jpeg", 0.8));
+    if (!frame) return;
+
+    const params = new URLSearchParams({ email: user?.email || "", name: user?.name || "" });
 
     try {
-      await fetch("http://localhost:5000/api/upload-frame", {
+      await fetch(`http://localhost:5000/api/frames?${params}`, {
         method: "POST",
         headers: {
-          "Content-Type": "application/json"
+          "Content-Type": "image/jpeg"
         },
-        body: JSON.stringify({
-          image: imageSrc,
-          name: user?.name,
-          email: user?.email,
-        })
+        body: frame
       });
     } catch (err) {
       console.error("Error:", err);
@@ -1,19 +1,40 @@
 
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, url_for, stream_with_context
 from flask_cors import CORS
+from werkzeug.http import generate_etag
 import joblib, os
+import multiprocessing
+import atexit
+import threading
+import time
     
-from utils.preprocessing import clean_text
-from pymongo import MongoClient
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.preprocessing import clean_text, clean_texts
+from utils.scoring import BatchScorer
+from utils.score_cache import ScoreCache, artifact_fingerprint, text_key
+from utils.question_bank import QuestionBank
+from utils.vocab_gate import VocabularyGate
+from utils.startup import ComponentRegistry, LazyProxy
+from utils.embedders import backend_model_files, backend_versions, load_embedder
+from utils.scoring_workers import ScoringWorkerPool, embed_and_classify
+from utils.reference_scoring import ReferenceBank
+from utils.live_events import ChangeStreamFeed, EventBroker, format_sse
+from utils.presence import PresenceTable
+from utils.write_behind import WriteBehindBusy, WriteBehindQueue
+from utils.passwords import HasherBusy, PasswordHasher
+from utils.google_tokens import GoogleTokenVerifier
+from utils.frame_ingest import FrameIngestor
+from utils.responses import choose_encoding, compress, dumps, prefetch, stream_json_array, stream_ndjson
+from database.indexes import ensure_indexes
+from database.session_totals import get_session_totals, record_scores_safely
+from database.blob_store import open_blob_store
+from database.login_history import LoginRecorder, login_history_version
+from database.frames import FRAME_METADATA, FRAME_SORT, encode_cursor, frames_query
+from pymongo import MongoClient, InsertOne
+from bson import ObjectId
 from dotenv import load_dotenv
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-import pandas as pd
-import base64
-from PIL import Image
-import io
+import json
+import re
 import numpy as np
 import uuid
 from datetime import datetime , timedelta
@@ -27,39 +48,340 @@ app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 BASE_DIR = os.path.dirname(__file__)
 
+# Startup mode for heavy artifacts (models, dataset, db):
+#   eager      - load everything before serving (old behaviour)
+#   background - start serving right away, load in a background thread (default)
+#   lazy       - load each artifact on first use
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background").lower()
+COMPONENTS = ComponentRegistry()
 
-from sentence_transformers import SentenceTransformer
-
-# Load semantic model
 MODEL_PATH = os.path.join(BASE_DIR, 'model', 'interview_semantic_clf.joblib')
-MODEL = joblib.load(MODEL_PATH)
-
-# Load semantic embedder
-VEC = SentenceTransformer('all-MiniLM-L6-v2')
-
-# Load TF-IDF vectorizer for robust gibberish detection
+EMBEDDER_NAME = 'all-MiniLM-L6-v2'
+# Embedder backend: torch (SentenceTransformer) | onnx | onnx-int8
+# ONNX models are created by export_onnx_embedder.py
+EMBEDDER_BACKEND = os.getenv("EMBEDDER_BACKEND", "torch").lower()
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(BASE_DIR, 'model', 'onnx'))
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))
+
+# Scoring mode:
+#   classifier - interview_semantic_clf.joblib on the answer embedding (default)
+#   reference  - similarity to the question's graded reference answers, no classifier call
+#   blend      - REFERENCE_BLEND_WEIGHT * reference + (1 - weight) * classifier
+# Questions without reference answers always fall back to the classifier.
+SCORING_MODE = os.getenv("SCORING_MODE", "classifier").lower()
+REFERENCE_BLEND_WEIGHT = float(os.getenv("REFERENCE_BLEND_WEIGHT", "0.5"))
+REFERENCE_TEMPERATURE = float(os.getenv("REFERENCE_TEMPERATURE", "0.05"))
+REFERENCE_DATASETS = [
+    os.path.join(BASE_DIR, 'model', 'dataset_full.csv'),
+    os.path.join(BASE_DIR, 'model', 'dataset_generated.csv'),
+]
+
+# Scoring worker processes (0 = score inside the Flask process)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0"))
+SCORING_WORKER_THREADS = int(os.getenv("SCORING_WORKER_THREADS", "1"))
+SCORING_WORKER_PIN = os.getenv("SCORING_WORKER_PIN", "0") == "1"
+SCORING_WORKER_TIMEOUT = float(os.getenv("SCORING_WORKER_TIMEOUT", "60"))   # seconds per batch
 TFIDF_VEC_PATH = os.path.join(BASE_DIR, 'model', 'vectorizer_calibrated.joblib')
-TFIDF_VEC = joblib.load(TFIDF_VEC_PATH)
-
-# Load Dataset
 DATASET_PATH = os.path.join(BASE_DIR, 'data', 'dataset.xlsx')
-df = pd.read_excel(DATASET_PATH)
+DATASET_CACHE_PATH = os.path.join(BASE_DIR, 'cache', 'question_bank.pkl')
+QUESTION_CATEGORIES = ["HR", "Technical", "Programming", "Database", "AI/ML"]
+QUESTIONS_PER_CATEGORY = 3
 
-# MongoDB Configuration
 # MongoDB Configuration
 MONGO_URI = os.getenv("MONGO_URI")
+# Create missing indexes on startup (see check_indexes.py to verify them)
+MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "1") == "1"
+# Proctoring frames: gridfs (default, bucket "blobs" in the same db) | filesystem (BLOB_DIR)
+BLOB_STORE = os.getenv("BLOB_STORE", "gridfs").lower()
+BLOB_DIR = os.getenv("BLOB_DIR", os.path.join(BASE_DIR, 'blobs'))
+# Admin dashboard event stream: follow Mongo change streams when the server supports them
+LIVE_CHANGE_STREAMS = os.getenv("LIVE_CHANGE_STREAMS", "1") == "1"
+LIVE_ACTIVE_SECONDS = 20
+# In-memory presence table for db.live: heartbeats are flushed every PRESENCE_FLUSH_SECONDS,
+# status changes are written immediately. Only correct with a single app process, so opt-in.
+PRESENCE_ENABLED = os.getenv("PRESENCE_ENABLED", "0") == "1"
+PRESENCE_FLUSH_SECONDS = float(os.getenv("PRESENCE_FLUSH_SECONDS", "15"))
+# Write-behind for results/frames inserts (0 = write inside the request like before)
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "1") == "1"
+WRITE_BEHIND_MAX_QUEUE = int(os.getenv("WRITE_BEHIND_MAX_QUEUE", "10000"))
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+WRITE_BEHIND_MAX_WAIT_MS = float(os.getenv("WRITE_BEHIND_MAX_WAIT_MS", "50"))
+# Writes Mongo rejects (or that are still unwritten at shutdown) are kept here, one JSON per line
+WRITE_BEHIND_SPILL_FILE = os.getenv("WRITE_BEHIND_SPILL_FILE", os.path.join(BASE_DIR, 'cache', 'write_behind_failed.jsonl'))
+# Longest a request waits for queue room or a write confirmation before answering 503
+WRITE_BEHIND_WAIT_SECONDS = float(os.getenv("WRITE_BEHIND_WAIT_SECONDS", "5"))
+SSE_KEEPALIVE_SECONDS = 15
+# Uploaded frames are downscaled/re-encoded; near-duplicates (dHash distance in bits) are not stored
+FRAME_MAX_WIDTH = int(os.getenv("FRAME_MAX_WIDTH", "640"))
+FRAME_MAX_HEIGHT = int(os.getenv("FRAME_MAX_HEIGHT", "480"))
+FRAME_JPEG_QUALITY = int(os.getenv("FRAME_JPEG_QUALITY", "70"))
+FRAME_DUPLICATE_BITS = int(os.getenv("FRAME_DUPLICATE_BITS", "4"))
+FRAME_INGEST_WORKERS = int(os.getenv("FRAME_INGEST_WORKERS", "1"))
+FRAME_MAX_UPLOAD_BYTES = int(os.getenv("FRAME_MAX_UPLOAD_BYTES", str(8 * 1024 * 1024)))
 print("Mongo URI:", MONGO_URI)
 if not MONGO_URI:
     raise Exception("❌ MONGO_URI not found in .env file")
 
-client = MongoClient(MONGO_URI)
-db = client['user_database']
-users_collection = db['users']
+
+def _load_classifier():
+    # Load semantic model
+    model = joblib.load(MODEL_PATH)
+    # Warm-up: first predict_proba pays for sklearn/BLAS initialisation
+    model.predict_proba(np.zeros((1, model.n_features_in_), dtype=np.float32))
+    return model
+
+
+def _load_embedder():
+    # Load semantic embedder
+    embedder = load_embedder(EMBEDDER_BACKEND, EMBEDDER_NAME, ONNX_MODEL_DIR, num_threads=ONNX_THREADS)
+    embedder.encode(["warm up"])
+    SCORE_CACHE.set_dim(embedder.get_sentence_embedding_dimension())
+    return embedder
+
+
+def _load_vectorizer():
+    # Load TF-IDF vectorizer for robust gibberish detection
+    return VocabularyGate(joblib.load(TFIDF_VEC_PATH))
+
+
+def _load_question_bank():
+    # Load Dataset - indexed once, requests never scan the DataFrame
+    return QuestionBank.load(DATASET_PATH, cache_path=DATASET_CACHE_PATH)
+
+
+def _load_scoring_workers():
+    pool = ScoringWorkerPool(
+        SCORING_WORKERS,
+        {
+            "embedder_backend": EMBEDDER_BACKEND,
+            "embedder_name": EMBEDDER_NAME,
+            "onnx_dir": ONNX_MODEL_DIR,
+            "model_path": MODEL_PATH,
+        },
+        torch_threads=SCORING_WORKER_THREADS,
+        pin_cpus=SCORING_WORKER_PIN,
+        call_timeout=SCORING_WORKER_TIMEOUT
+    )
+    SCORE_CACHE.set_dim(pool.dim)
+    return pool
+
+
+def _reference_rows():
+    import pandas as pd
+    rows = []
+    for path in REFERENCE_DATASETS:
+        ref_df = pd.read_csv(path).dropna(subset=['question_id', 'answer', 'score'])
+        cleaned = clean_texts(ref_df['answer'].astype(str))
+        rows.extend(zip(ref_df['question_id'], cleaned, ref_df['score']))
+    return rows
+
+
+def _load_reference_bank():
+    # Stored per embedder + dataset version, memory-mapped by every worker
+    fingerprint = artifact_fingerprint(REFERENCE_DATASETS, EMBEDDING_FINGERPRINT)
+    return ReferenceBank.load_or_build(
+        os.path.join(BASE_DIR, 'cache', 'references', fingerprint),
+        _reference_rows,
+        lambda texts: _embed_and_classify(texts, None, classify=False)[0]
+    )
+
+
+def _load_db():
+    client = MongoClient(MONGO_URI)
+    client.admin.command("ping")
+    database = client['user_database']
+    if MONGO_ENSURE_INDEXES:
+        ensure_indexes(database)
+    return database
+
+
+def _load_blob_store():
+    return open_blob_store(BLOB_STORE, db=COMPONENTS.get("db"), root=BLOB_DIR)
+
+
+def _load_live_feed():
+    handlers = {"login_history": _login_change}
+    if not PRESENCE_ENABLED:
+        # With the presence table this process owns db.live and publishes its own changes
+        handlers["live"] = _live_change
+    feed = ChangeStreamFeed(COMPONENTS.get("db"), LIVE_EVENTS, handlers)
+    if LIVE_CHANGE_STREAMS:
+        feed.start()
+    return feed
+
+
+COMPONENTS.register("db", _load_db)
+COMPONENTS.register("blob_store", _load_blob_store)
+COMPONENTS.register("live_feed", _load_live_feed)
+if PRESENCE_ENABLED:
+    COMPONENTS.register("presence", lambda: PresenceTable(lambda: db.live, flush_seconds=PRESENCE_FLUSH_SECONDS))
+if WRITE_BEHIND:
+    COMPONENTS.register("write_behind", lambda: WriteBehindQueue(
+        lambda: db,
+        max_queue=WRITE_BEHIND_MAX_QUEUE,
+        max_batch_size=WRITE_BEHIND_MAX_BATCH,
+        max_wait_ms=WRITE_BEHIND_MAX_WAIT_MS,
+        spill_path=WRITE_BEHIND_SPILL_FILE,
+        wait_timeout=WRITE_BEHIND_WAIT_SECONDS
+    ))
+COMPONENTS.register("question_bank", _load_question_bank)
+COMPONENTS.register("vectorizer", _load_vectorizer)
+if SCORING_WORKERS > 0:
+    COMPONENTS.register("scoring_workers", _load_scoring_workers)
+else:
+    COMPONENTS.register("classifier", _load_classifier)
+    COMPONENTS.register("embedder", _load_embedder)
+if SCORING_MODE != "classifier":
+    COMPONENTS.register("reference_bank", _load_reference_bank)
+
+# Module-level names resolve to the loaded objects on first use
+MODEL = LazyProxy(lambda: COMPONENTS.get("classifier"))
+VEC = LazyProxy(lambda: COMPONENTS.get("embedder"))
+VOCAB_GATE = LazyProxy(lambda: COMPONENTS.get("vectorizer"))
+QUESTION_BANK = LazyProxy(lambda: COMPONENTS.get("question_bank"))
+REFERENCES = LazyProxy(lambda: COMPONENTS.get("reference_bank"))
+db = LazyProxy(lambda: COMPONENTS.get("db"))
+users_collection = LazyProxy(lambda: db['users'])
+BLOBS = LazyProxy(lambda: COMPONENTS.get("blob_store"))
+PRESENCE = LazyProxy(lambda: COMPONENTS.get("presence"))
+WRITES = LazyProxy(lambda: COMPONENTS.get("write_behind"))
+
+
+# ------------------ Live state (db.live) ------------------
+def _live_get(email):
+    if PRESENCE_ENABLED:
+        return PRESENCE.get(email)
+    return db.live.find_one({"email": email}, {"_id": 0})
+
+
+def _live_update(email, fields, unset=(), upsert=True):
+    if PRESENCE_ENABLED:
+        PRESENCE.update(email, fields, unset=unset, upsert=upsert)
+        return
+    update = {"$set": fields}
+    if unset:
+        update["$unset"] = {f: "" for f in unset}
+    db.live.update_one({"email": email}, update, upsert=upsert)
+
+
+def _live_find(query=None):
+    if PRESENCE_ENABLED:
+        return PRESENCE.snapshot(query)
+    return list(db.live.find(query or {}, {"_id": 0}))
+
+
+@atexit.register
+def _flush_presence():
+    # Heartbeats still waiting for the next flush
+    if PRESENCE_ENABLED and COMPONENTS.is_ready("presence"):
+        PRESENCE.close()
+
+
+# ------------------ Inserts (write-behind) ------------------
+def _insert(collection, docs, after=None, sync=False, key=None):
+    """
+    Queues inserts for the write-behind thread; `after` runs once they are
+    written. sync=True (or WRITE_BEHIND=0) waits for the write; `key` lets
+    _wait_for_writes(key) wait for just these inserts.
+    """
+    if not WRITE_BEHIND:
+        db[collection].insert_many(docs)
+        if after is not None:
+            after()
+        return
+
+    for i, doc in enumerate(docs):
+        doc.setdefault("_id", ObjectId())   # ids follow submission order
+        last = i == len(docs) - 1
+        WRITES.submit(collection, InsertOne(doc), after=after if last else None, wait=sync and last, key=key)
+
+
+def _wait_for_writes(key):
+    # Read-your-writes for one session, without queueing behind everyone's frames
+    if WRITE_BEHIND and COMPONENTS.is_ready("write_behind"):
+        WRITES.wait_for(key)
+
+
+@atexit.register
+def _drain_writes():
+    # Registered after _flush_presence, so it runs first at exit
+    if WRITE_BEHIND and COMPONENTS.is_ready("write_behind"):
+        WRITES.close()
+
+
+# ------------------ Frame ingestion ------------------
+def _frame_ingested(email, name, image):
+    last_active = datetime.now().isoformat()
+    if image is None:
+        # Near-duplicate of the last stored frame: nothing stored, but the candidate is still there
+        _live_update(email, {"lastActive": last_active}, upsert=False)
+        live = _live_get(email)
+        if live:
+            _publish_live("heartbeat", {"email": email, "lastActive": last_active, "isActive": _is_active(live)})
+        return
+
+    _insert("frames", [_frame_record({"name": name, "email": email}, image)])
+    # Update live collection with the latest image for fast retrieval
+    _live_update(email, {**image, "lastActive": last_active}, unset=("image",), upsert=False)
+    _publish_live("frame", {"email": email, "image_ref": image["image_ref"]})
 
 
+FRAME_INGEST = FrameIngestor(
+    BLOBS,
+    _frame_ingested,
+    previous_hash_fn=lambda email: (_live_get(email) or {}).get("image_hash"),
+    max_size=(FRAME_MAX_WIDTH, FRAME_MAX_HEIGHT),
+    quality=FRAME_JPEG_QUALITY,
+    max_distance=FRAME_DUPLICATE_BITS,
+    workers=FRAME_INGEST_WORKERS
+)
+
+
+@atexit.register
+def _drain_frames():
+    # Registered after _drain_writes, so queued frames reach the write-behind queue before it closes
+    FRAME_INGEST.close()
+
+
+LOGIN_RECORDER = LoginRecorder(lambda: db.login_history, window_seconds=60)
+
+
+def _record_login(name, email):
+    entry = LOGIN_RECORDER.record(name, email)
+    if entry is not None:
+        _publish_live("login", _login_event(entry))
+    return entry
+
+
+# Password hashing: werkzeug method string (e.g. scrypt, scrypt:16384:8:1, pbkdf2:sha256:600000),
+# run on a bounded pool. Stored hashes with other parameters are upgraded on the next login.
+PASSWORDS = PasswordHasher(
+    method=os.getenv("PASSWORD_HASH_METHOD", "scrypt"),
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None,
+    max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", "256")),
+    queue_timeout=float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2"))
+)
+
+
+@app.errorhandler(HasherBusy)
+@app.errorhandler(WriteBehindBusy)
+def _server_busy(e):
+    # Login storm / Mongo backlog: turn the request away rather than queue it without limit
+    response = jsonify({"error": "Server busy, please try again"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
 # Google Client ID
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "467984197043-d455hh4reb5sse2m3adkddhp6jdufef3.apps.googleusercontent.com")
 
+# Google signing certs are cached per Cache-Control; GOOGLE_CERTS_FILE ({kid: PEM} JSON) verifies offline
+GOOGLE_VERIFIER = GoogleTokenVerifier(
+    GOOGLE_CLIENT_ID,
+    cert_file=os.getenv("GOOGLE_CERTS_FILE") or None,
+    clock_skew_seconds=int(os.getenv("GOOGLE_CLOCK_SKEW_SECONDS", "10")),
+    min_refresh_interval=int(os.getenv("GOOGLE_CERTS_MIN_REFRESH_SECONDS", "60"))
+)
+
 # Make sure your Excel has columns: question_id, question
 
 @app.route('/')
@@ -68,37 +390,42 @@ def index():
 
 @app.route('/health')
 def health():
-    return jsonify({"status": "ok"}), 200
+    # 503 while a component is loading or failed, so load balancers skip cold workers.
+    # Lazy mode: components nobody asked for yet don't count - they load on first use.
+    waiting = COMPONENTS.not_ready(include_pending=STARTUP_MODE != "lazy")
+    ready = not waiting
+    payload = {
+        "status": "ok" if ready else "starting",
+        "waiting_for": waiting,
+        "startup_mode": STARTUP_MODE,
+        "embedder_backend": EMBEDDER_BACKEND,
+        "scoring_mode": SCORING_MODE,
+        "components": COMPONENTS.status(),
+        "score_cache": SCORE_CACHE.stats(),
+        "live_events": LIVE_EVENTS.stats(),
+        "google_certs": GOOGLE_VERIFIER.stats(),
+        "frame_ingest": FRAME_INGEST.stats()
+    }
+    if PRESENCE_ENABLED and COMPONENTS.is_ready("presence"):
+        payload["presence"] = PRESENCE.stats()
+    if WRITE_BEHIND and COMPONENTS.is_ready("write_behind"):
+        payload["write_behind"] = WRITES.stats()
+    if SCORING_WORKERS > 0 and COMPONENTS.is_ready("scoring_workers"):
+        payload["scoring_workers"] = COMPONENTS.get("scoring_workers").stats()
+    return jsonify(payload), 200 if ready else 503
 
 # ------------------ API: Get Question ------------------
 @app.route('/api/questions', methods=['GET'])
 def get_questions():
     try:
         session_id = str(uuid.uuid4())
-        categories = ["HR", "Technical", "Programming", "Database", "AI/ML"]
         final_questions = []
 
-        for cat in categories:
-            # Filter category
-            cat_df = df[df['category'] == cat].copy()
-
-             # Remove duplicate questions (case-insensitive)
-            cat_df['question_clean'] = cat_df['question'].str.lower().str.strip()
-            cat_df = cat_df.drop_duplicates(subset='question_clean')
-
-            # Shuffle the category questions
-            cat_df = cat_df.sample(frac=1).reset_index(drop=True)
-
-            # Pick 3 random questions (or less if not enough)
-            selected = cat_df.head(3)
-
-            for _, row in selected.iterrows():
-                final_questions.append({
-                    "question_id": str(row["question_id"]),
-                    "question": row["question"],
-                    "category": row["category"],
-                    "session_id": session_id
-                })
+        for cat in QUESTION_CATEGORIES:
+            # Pick 3 random unique questions (or less if not enough)
+            for q in QUESTION_BANK.sample(cat, QUESTIONS_PER_CATEGORY):
+                q["session_id"] = session_id
+                final_questions.append(q)
 
         return jsonify({
             "session_id":session_id,
@@ -110,42 +437,87 @@ def get_questions():
         return jsonify({"error": str(e)}), 500
 
 
-def predict_score_dict(answer_text):
+SCORING_MAX_BATCH = int(os.getenv("SCORING_MAX_BATCH", "32"))
+SCORING_MAX_WAIT_MS = float(os.getenv("SCORING_MAX_WAIT_MS", "10"))
+
+# Score cache - memory LRU always on, disk tier only when SCORE_CACHE_DIR is set.
+# Fingerprints tie entries to the loaded classifier/embedder, so retraining or
+# swapping the embedder starts from an empty cache.
+SCORE_CACHE_DIR = os.getenv("SCORE_CACHE_DIR", "")
+EMBEDDING_FINGERPRINT = artifact_fingerprint(
+    backend_model_files(EMBEDDER_BACKEND, ONNX_MODEL_DIR, EMBEDDER_NAME), EMBEDDER_NAME, EMBEDDER_BACKEND,
+    *backend_versions(EMBEDDER_BACKEND)
+)
+SCORE_CACHE = ScoreCache(
+    artifact_fingerprint([MODEL_PATH], EMBEDDING_FINGERPRINT),
+    embedding_fingerprint=EMBEDDING_FINGERPRINT,
+    max_entries=int(os.getenv("SCORE_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.getenv("SCORE_CACHE_TTL", "3600")),
+    disk_dir=SCORE_CACHE_DIR or None
+)
+
+
+def _zero_score():
+    return {
+        "expected_class": 0.0,
+        "score_0_5": 0.0,
+        "probabilities": [1.0, 0.0, 0.0]
+    }
+
+
+def _prefilter_answer(cleaned):
     """
-    Returns: expected_class (float), score_0_5 (float), probabilities (list)
+    Cheap checks on a cleaned answer that run before the model.
+    Returns a result when the answer is rejected early, otherwise None.
     """
-    cleaned = clean_text(answer_text)
-    
     # If the text is empty after cleaning
     if not cleaned.strip():
-        return {
-            "expected_class": 0.0,
-            "score_0_5": 0.0,
-            "probabilities": [1.0, 0.0, 0.0]
-        }
+        return _zero_score()
 
-    import re
     # Simple length check
     if len(re.sub(r'[^a-zA-Z]', '', cleaned)) < 3:
-        return {
-            "expected_class": 0.0,
-            "score_0_5": 0.0,
-            "probabilities": [1.0, 0.0, 0.0]
-        }
-        
+        return _zero_score()
+
     # Robust gibberish check using the old TF-IDF vocabulary
     # If no words in the answer match any training data words, it's gibberish/off-topic.
-    if TFIDF_VEC.transform([cleaned]).nnz == 0:
-        return {
-            "expected_class": 0.0,
-            "score_0_5": 0.0,
-            "probabilities": [1.0, 0.0, 0.0]
-        }
+    if not VOCAB_GATE.accepts(cleaned):
+        return _zero_score()
 
-    X = VEC.encode([cleaned])
-        
-    proba = MODEL.predict_proba(X)[0]                # probabilities for classes [0,1,2]
-    classes = np.array(sorted(MODEL.classes_), dtype=float)
+    return None
+
+
+def _scoring_backend():
+    if SCORING_WORKERS > 0:
+        return COMPONENTS.get("scoring_workers")
+    return COMPONENTS.get("embedder"), COMPONENTS.get("classifier")
+
+
+def _embed_and_classify(texts, embeddings, classify=True):
+    backend = _scoring_backend()
+    if SCORING_WORKERS > 0:
+        return backend.run(texts, embeddings, classify=classify)
+    embedder, classifier = backend
+    return embed_and_classify(embedder, classifier, texts, embeddings, classify=classify)
+
+
+def _classifier_classes():
+    if SCORING_WORKERS > 0:
+        return COMPONENTS.get("scoring_workers").classes
+    return MODEL.classes_
+
+
+def _uses_references(question_id):
+    return SCORING_MODE != "classifier" and question_id is not None and REFERENCES.has(question_id)
+
+
+def _score_key(cleaned, question_id):
+    # Reference scores depend on the question, classifier scores only on the text
+    if _uses_references(question_id):
+        return text_key(f"{str(question_id).strip()}\n{cleaned}")
+    return text_key(cleaned)
+
+
+def _result_from_proba(proba, classes):
     expected = float((proba * classes).sum())
     max_class = classes.max() if classes.size else 1.0
     score_0_5 = (expected / max_class) * 5.0 if max_class > 0 else expected
@@ -155,6 +527,169 @@ def predict_score_dict(answer_text):
         "probabilities": [round(float(x), 4) for x in proba.tolist()]
     }
 
+
+def _score_cleaned_batch(items):
+    """
+    items: (cleaned_answer, question_id) pairs.
+    One batched encode for the whole batch, then one predict_proba and/or
+    one reference dot product per question, depending on SCORING_MODE.
+    Embeddings already in the disk cache skip the encoder.
+    """
+    _scoring_backend()   # loads the models and opens the disk cache tier on first use
+    emb_keys = [text_key(cleaned) for cleaned, _ in items]
+    unique = dict(zip(emb_keys, (cleaned for cleaned, _ in items)))   # duplicate texts are encoded once
+
+    embeddings = {}
+    to_encode = []
+    for key, text in unique.items():
+        emb = SCORE_CACHE.get_embedding(key)
+        if emb is not None:
+            embeddings[key] = emb
+        else:
+            to_encode.append((key, text))
+
+    new_keys = [k for k, _ in to_encode]
+    cached_keys = [k for k in unique if k in embeddings]
+    SCORE_CACHE.record_miss(len(new_keys))
+
+    # The classifier is skipped entirely in reference mode when every question has references
+    ref_items = [_uses_references(qid) for _, qid in items]
+    need_classifier = SCORING_MODE != "reference" or not all(ref_items)
+
+    # New texts are encoded, then everything goes through one predict_proba
+    X_new, clf_probas = _embed_and_classify(
+        [t for _, t in to_encode],
+        np.vstack([embeddings[k] for k in cached_keys]) if cached_keys else None,
+        classify=need_classifier
+    )
+    if new_keys:
+        SCORE_CACHE.put_embeddings(new_keys, X_new)
+
+    order = new_keys + cached_keys               # row order of X_all / clf_probas
+    row_of = {k: i for i, k in enumerate(order)}
+    X_all = np.vstack(([X_new] if new_keys else []) + [embeddings[k][None, :] for k in cached_keys])
+
+    if need_classifier:
+        classes = np.array(sorted(_classifier_classes()), dtype=float)   # probabilities for classes [0,1,2]
+    else:
+        classes = np.array(REFERENCES.classes, dtype=float)
+
+    # 🔹 Reference similarity - one dot product per question in the batch
+    ref_probas = {}
+    by_question = {}
+    for idx, ((_, qid), use_ref) in enumerate(zip(items, ref_items)):
+        if use_ref:
+            by_question.setdefault(str(qid).strip(), []).append(idx)
+    for qid, idxs in by_question.items():
+        rows = [row_of[emb_keys[i]] for i in idxs]
+        probas = REFERENCES.probabilities(qid, X_all[rows], temperature=REFERENCE_TEMPERATURE)
+        probas = _align_classes(probas, REFERENCES.classes, classes)
+        for i, proba in zip(idxs, probas):
+            ref_probas[i] = proba
+
+    results = []
+    done = {}
+    for idx, ((cleaned, qid), emb_key) in enumerate(zip(items, emb_keys)):
+        key = _score_key(cleaned, qid)
+        if key not in done:
+            if idx in ref_probas and SCORING_MODE == "blend":
+                proba = (REFERENCE_BLEND_WEIGHT * ref_probas[idx]
+                         + (1 - REFERENCE_BLEND_WEIGHT) * clf_probas[row_of[emb_key]])
+            elif idx in ref_probas:
+                proba = ref_probas[idx]
+            else:
+                proba = clf_probas[row_of[emb_key]]
+            done[key] = _result_from_proba(proba, classes)
+            SCORE_CACHE.put_score(key, done[key])
+        results.append({**done[key], "probabilities": list(done[key]["probabilities"])})
+
+    return results
+
+
+def _align_classes(probas, from_classes, to_classes):
+    """Reorders probability columns from one class list to another (missing classes get 0)."""
+    if list(from_classes) == list(to_classes):
+        return probas
+    aligned = np.zeros((probas.shape[0], len(to_classes)), dtype=probas.dtype)
+    for ci, cls in enumerate(from_classes):
+        matches = np.where(to_classes == cls)[0]
+        if matches.size:
+            aligned[:, matches[0]] = probas[:, ci]
+    return aligned
+
+
+# 🔥 Concurrent requests are queued and scored together in one forward pass
+SCORER = BatchScorer(
+    _score_cleaned_batch,
+    max_batch_size=SCORING_MAX_BATCH,
+    max_wait_ms=SCORING_MAX_WAIT_MS,
+    concurrency=max(1, SCORING_WORKERS)   # one batch in flight per worker process
+)
+
+
+def predict_score_dict(answer_text, question_id=None):
+    """
+    Returns: expected_class (float), score_0_5 (float), probabilities (list)
+    question_id is needed for the reference/blend scoring modes.
+    """
+    cleaned = clean_text(answer_text)
+    early = _prefilter_answer(cleaned)
+    if early is not None:
+        return early
+
+    cached = SCORE_CACHE.get_score(_score_key(cleaned, question_id))
+    if cached is not None:
+        return cached
+
+    return SCORER.score((cleaned, question_id))
+
+
+def predict_score_dicts(answer_texts, question_ids=None):
+    """
+    Batch version of predict_score_dict - one result dict per answer, in order.
+    """
+    if question_ids is None:
+        question_ids = [None] * len(answer_texts)
+
+    results = [None] * len(answer_texts)
+    to_score = []
+
+    cleaned_answers = clean_texts(answer_texts)
+    for i, (cleaned, question_id) in enumerate(zip(cleaned_answers, question_ids)):
+        early = _prefilter_answer(cleaned)
+        if early is None:
+            early = SCORE_CACHE.get_score(_score_key(cleaned, question_id))
+
+        if early is not None:
+            results[i] = early
+        else:
+            to_score.append((i, (cleaned, question_id)))
+
+    if to_score:
+        scored = SCORER.score_many([item for _, item in to_score])
+        for (i, _), result in zip(to_score, scored):
+            results[i] = result
+
+    return results
+
+
+def _find_question_category(question_id):
+    """
+    Returns (category, error_message, status_code).
+    """
+    # 🔥 FIX: handle q5 → 5
+    question_id_clean = ''.join(filter(str.isdigit, str(question_id)))
+
+    if not question_id_clean:
+        return None, "Invalid question_id", 400
+
+    found = QUESTION_BANK.lookup(question_id)
+
+    if found is None:
+        return None, "Question not found", 404
+
+    return found[1], None, 200
+
 # ------------------ API: Submit Answer ------------------
 @app.route('/api/submit-answer', methods=['POST'])
 def submit_answer():
@@ -173,24 +708,13 @@ def submit_answer():
         return jsonify({"error": "Missing answer or question_id"}), 400
 
     try:
-        # 🔥 FIX: handle q5 → 5
-        question_id_clean = ''.join(filter(str.isdigit, str(question_id)))
+        category, error, status = _find_question_category(question_id)
 
-        if not question_id_clean:
-            return jsonify({"error": "Invalid question_id"}), 400
-
-        question_id_str = str(question_id).strip()
-
-        row = df[df['question_id'].astype(str) == question_id_str]
-
-
-        if row.empty:
-            return jsonify({"error": "Question not found"}), 404
-
-        category = row.iloc[0]['category']
+        if error:
+            return jsonify({"error": error}), status
 
         # 🔥 Predict score
-        result = predict_score_dict(answer)
+        result = predict_score_dict(answer, question_id)
 
         record = {
             "question_id": question_id,
@@ -199,17 +723,94 @@ def submit_answer():
             "session_id": session_id 
         }
 
-        db.results.insert_one(record)
+        # Stored by the write-behind thread; "sync": true waits for it
+        _insert("results", [record], after=lambda: record_scores_safely(db, session_id, [record]),
+                sync=data.get("sync") is True, key=("results", session_id))
 
         return jsonify({
             "message": "Answer submitted successfully",
             "prediction": result
         }), 200
 
+    except WriteBehindBusy:
+        raise
     except Exception as e:
         print("SUBMIT ERROR:", e)
         return jsonify({"error": str(e)}), 500
     
+# ------------------ API: Submit Answers (batch) ------------------
+@app.route('/api/submit-answers', methods=['POST'])
+def submit_answers():
+    data = request.get_json() or {}
+    session_id = data.get("session_id")
+    answers = data.get("answers")
+
+    if not session_id or not isinstance(answers, list):
+        return jsonify({"error": "session_id and answers list required"}), 400
+
+    try:
+        results = [None] * len(answers)
+        to_score = []
+
+        for i, item in enumerate(answers):
+            item = item if isinstance(item, dict) else {}
+            answer = item.get("answer", "")
+            question_id = item.get("question_id")
+
+            if answer is None or not str(answer).strip():
+                results[i] = {
+                    "question_id": question_id,
+                    "prediction": {"expected_class": 0},
+                    "message": "Skipped"
+                }
+                continue
+
+            if not question_id:
+                results[i] = {"question_id": question_id, "error": "Missing answer or question_id"}
+                continue
+
+            category, error, _ = _find_question_category(question_id)
+            if error:
+                results[i] = {"question_id": question_id, "error": error}
+                continue
+
+            to_score.append((i, question_id, category, answer))
+
+        # 🔥 Score every answer in one batched model call
+        predictions = predict_score_dicts(
+            [answer for _, _, _, answer in to_score],
+            [question_id for _, question_id, _, _ in to_score]
+        )
+
+        records = []
+        for (i, question_id, category, _), result in zip(to_score, predictions):
+            records.append({
+                "question_id": question_id,
+                "category": category,
+                "score": result["expected_class"],
+                "session_id": session_id
+            })
+            results[i] = {
+                "question_id": question_id,
+                "message": "Answer submitted successfully",
+                "prediction": result
+            }
+
+        if records:
+            _insert("results", records, after=lambda: record_scores_safely(db, session_id, records),
+                    sync=data.get("sync") is True, key=("results", session_id))
+
+        return jsonify({
+            "message": "Answers submitted successfully",
+            "results": results
+        }), 200
+
+    except WriteBehindBusy:
+        raise
+    except Exception as e:
+        print("SUBMIT BATCH ERROR:", e)
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/career-guidance', methods=['GET'])
 def career_guidance():
     try:
@@ -218,7 +819,10 @@ def career_guidance():
         if not session_id:
             return jsonify({"error": "session_id required"}), 400
 
-        results = list(db.results.find({"session_id": session_id}, {"_id": 0}))
+        # 🔹 Per-session totals, kept up to date by submit-answer
+        _wait_for_writes(("results", session_id))
+        totals = get_session_totals(db, session_id) or {}
+
         # 🔹 Initialize category scores
         category_scores = {
             "HR": 0,
@@ -228,14 +832,7 @@ def career_guidance():
             "AI/ML": 0
         }
 
-        # 🔹 Aggregate scores
-        for r in results:
-            if "category" not in r or "score" not in r:
-                continue
-
-            cat = r["category"]
-            score = r["score"]
-
+        for cat, score in totals.get("totals", {}).items():
             if cat in category_scores:
                 category_scores[cat] += score
 
@@ -266,64 +863,45 @@ def career_guidance():
             "career_guidance": career_map[best_category]
         })
 
+    except WriteBehindBusy:
+        raise
     except Exception as e:
         print("Career Guidance Error:", e)
         return jsonify({"error": str(e)}), 500
    
+ALLOWED_EMAIL_PROVIDERS = ["gmail.com","yahoo.com","outlook.com","hotmail.com","icloud.com"]
+
+
+def _allowed_provider(email):
+    return email.split("@")[1].lower() in ALLOWED_EMAIL_PROVIDERS
+
+
+def _google_user(idinfo):
+    return {
+        "name": idinfo.get('name', ''),
+        "email": idinfo['email'],
+        "google_id": idinfo['sub']
+    }
+
+
 @app.route('/google-login', methods=['POST'])
 def google_login():
     data = request.json
     token = data.get('credential')
     
     try:
-        req = google_requests.Request()
-        idinfo = id_token.verify_oauth2_token(token, req, GOOGLE_CLIENT_ID)
+        idinfo = GOOGLE_VERIFIER.verify(token)
 
-        email = idinfo['email']
-        name = idinfo.get('name', '')
+        google_user = _google_user(idinfo)
+        name, email = google_user["name"], google_user["email"]
 
         user = users_collection.find_one({"email": email})
 
         if not user:
-            users_collection.insert_one({
-                "name": name,
-                "email": email,
-                "google_id": idinfo['sub']
-            })
-
-        now = datetime.utcnow()
-
-        last_login = db.login_history.find_one(
-            {"email": email},
-            sort=[("loginTime", -1)]
-        )
+            users_collection.insert_one(google_user)
 
-        should_insert = True
-
-        if last_login and "loginTime" in last_login:
-            last_time = last_login["loginTime"]
-
-            # 🔥 HANDLE STRING FORMAT SAFELY
-            if isinstance(last_time, str):
-                try:
-                    last_time = datetime.fromisoformat(last_time)
-                except:
-                    try:
-                        last_time = datetime.strptime(last_time, "%Y-%m-%d %H:%M:%S")
-                    except:
-                        last_time = None
-
-            if last_time:
-                diff = (now - last_time).total_seconds()
-                if diff < 60:
-                    should_insert = False
-
-        if should_insert:
-            db.login_history.insert_one({
-                "name": name,
-                "email": email,
-                "loginTime": now
-            })
+        # 🔹 At most one login_history entry per minute - one round trip at most
+        _record_login(name, email)
 
         return jsonify({
             "message": "Google Login successful",
@@ -343,11 +921,8 @@ def signup():
     name = data.get('name')
     email = data.get('email')
     password = data.get('password')
-    allowed = ["gmail.com","yahoo.com","outlook.com","hotmail.com","icloud.com"]
-
-    domain = email.split("@")[1].lower()
 
-    if domain not in allowed:
+    if not _allowed_provider(email):
         return jsonify({"error": "Use valid email provider"}), 400
 
     if not name or not email or not password:
@@ -356,7 +931,7 @@ def signup():
     if users_collection.find_one({"email": email}):
         return jsonify({"error": "User already exists"}), 400
 
-    hashed_password = generate_password_hash(password)
+    hashed_password = PASSWORDS.hash(password)
     user_data = {
         "name": name,
         "email": email,
@@ -371,11 +946,8 @@ def login():
     data = request.json
     email = data.get('email')
     password = data.get('password')
-    allowed = ["gmail.com","yahoo.com","outlook.com","hotmail.com","icloud.com"]
-
-    domain = email.split("@")[1].lower()
 
-    if domain not in allowed:
+    if not _allowed_provider(email):
         return jsonify({"error":"Use valid email provider"}), 400
 
     if not email or not password:
@@ -383,41 +955,17 @@ def login():
 
     user = users_collection.find_one({"email": email})
 
-    if user and check_password_hash(user['password'], password):
+    if user and PASSWORDS.verify(user.get('password'), password):
 
-        now = datetime.utcnow()
-
-        last_login = db.login_history.find_one(
-            {"email": email},
-            sort=[("loginTime", -1)]
-        )
+        # 🔹 Upgrade hashes made with older parameters, off the request path
+        if PASSWORDS.needs_rehash(user['password']):
+            PASSWORDS.rehash_later(password, lambda new_hash: users_collection.update_one(
+                {"_id": user["_id"], "password": user["password"]},
+                {"$set": {"password": new_hash}}
+            ))
 
-        should_insert = True
-
-        if last_login and "loginTime" in last_login:
-            last_time = last_login["loginTime"]
-
-            # 🔥 HANDLE STRING FORMAT SAFELY
-            if isinstance(last_time, str):
-                try:
-                    last_time = datetime.fromisoformat(last_time)
-                except:
-                    try:
-                        last_time = datetime.strptime(last_time, "%Y-%m-%d %H:%M:%S")
-                    except:
-                        last_time = None
-
-            if last_time:
-                diff = (now - last_time).total_seconds()
-                if diff < 60:
-                    should_insert = False
-
-        if should_insert:
-            db.login_history.insert_one({
-            "name": user['name'],
-            "email": user['email'],
-            "loginTime": now
-        })
+        # 🔹 At most one login_history entry per minute - one round trip at most
+        _record_login(user['name'], user['email'])
 
         return jsonify({
             "message": "Login successful",
@@ -447,110 +995,549 @@ def admin_login():
     else:
         return jsonify({"error": "Invalid Admin Credentials"}), 401
 
-@app.route('/api/live', methods=['POST'])
-def update_live():
-    data = request.json
-
-    if not data.get("email"):
-        return jsonify({"error": "Email required"}), 400
-
-    # ✅ GET EXISTING USER
-    existing = db.live.find_one({"email": data.get("email")})
-
+def _live_post(data, existing):
+    """
+    What a POST /api/live body does to the candidate's live document, given
+    the current one: (fields, upsert, event, event_data, message).
+    Shared with the async server.
+    """
     if existing and existing.get("isCompleted"):
         # If this is a fresh start (Start Interview button), it sends isCompleted: false
         if "isCompleted" in data and data["isCompleted"] is False:
             pass # Allow full update to restart
         else:
             # It's just a heartbeat from a stopped/completed interview, so only update lastActive
-            db.live.update_one(
-                {"email": data.get("email")},
-                {"$set": {"lastActive": datetime.now().isoformat()}}
-            )
-            return jsonify({"message": "kept as completed"})
+            last_active = datetime.now().isoformat()
+            event_data = {"email": data.get("email"), "lastActive": last_active, "isActive": False}
+            return {"lastActive": last_active}, False, "heartbeat", event_data, "kept as completed"
 
     # ✅ UPDATE LAST ACTIVE
     data["lastActive"] = datetime.now().isoformat()
 
-    # ✅ UPDATE DATABASE
-    db.live.update_one(
-        {"email": data.get("email")},
-        {"$set": data},
-        upsert=True
-    )
+    # 🔹 Push the change to the admin dashboard - a plain heartbeat if only lastActive moved
+    view = _live_view({**(existing or {}), **data})
+    if existing and all(existing.get(k) == v for k, v in data.items() if k != "lastActive"):
+        event_data = {"email": view["email"], "lastActive": view["lastActive"], "isActive": view["isActive"]}
+        return data, True, "heartbeat", event_data, "updated"
+    view.pop("_id", None)
+    return data, True, "live", view, "updated"
 
-    return jsonify({"message": "updated"})
+
+@app.route('/api/live', methods=['POST'])
+def update_live():
+    data = request.json
+
+    if not data.get("email"):
+        return jsonify({"error": "Email required"}), 400
+
+    # ✅ GET EXISTING USER
+    existing = _live_get(data.get("email"))
+    fields, upsert, event, event_data, message = _live_post(data, existing)
+
+    # ✅ UPDATE DATABASE (heartbeats are batched, status changes written right away)
+    _live_update(data.get("email"), fields, upsert=upsert)
+    _publish_live(event, event_data)
+
+    return jsonify({"message": message})
 
 @app.route('/api/all-users', methods=['GET'])
 def get_all_users():
-    users = list(db.login_history.find({}, {"_id": 0}))
-    for u in users:
-        if "loginTime" in u and hasattr(u["loginTime"], "isoformat"):
-            u["loginTime"] = u["loginTime"].isoformat() + "Z"
-    return jsonify(users)
+    # Streamed straight from the cursor - the full history is never held in memory
+    version = login_history_version(db.login_history)
+    held = _held_etag(version, _response_encoding(), request.if_none_match)
+    if held:
+        return _not_modified(held)
+    cursor = db.login_history.find({}, {"_id": 0}).batch_size(1000)
+    return _json_stream(cursor, etag=version)
+
+def _frame_record(data, image):
+    return {
+        "name": data.get("name"),
+        "email": data.get("email"),
+        **image,
+        "time": datetime.now().isoformat()
+    }
+
 
 @app.route('/api/upload-frame', methods=['POST'])
 def upload_frame():
     data = request.json
 
-    record = {
-        "name": data.get("name"),
-        "email": data.get("email"),
-        "image": data.get("image"),
-        "time": datetime.now().isoformat()
-    }
+    image = data.get("image")
+    if not isinstance(image, str) or not image:
+        return jsonify({"error": "Invalid image"}), 400
 
-    db.frames.insert_one(record)
-    
-    # Update live collection with the latest image for fast retrieval
-    db.live.update_one(
-        {"email": data.get("email")},
-        {"$set": {"image": data.get("image")}}
+    # Decoded, downscaled, deduplicated and stored by the ingest thread
+    FRAME_INGEST.submit(data.get("email"), data.get("name"), image)
+
+    return jsonify({"message": "Frame received"}), 202
+
+
+FRAME_UPLOAD_TYPES = ("image/jpeg", "image/webp", "image/png", "application/octet-stream")
+
+
+def _frame_upload_meta(args, headers, form=None):
+    """email, name from the query string, X-Candidate-Email/-Name headers or multipart fields."""
+    def field(key):
+        return args.get(key) or headers.get(f"X-Candidate-{key.title()}") or (form or {}).get(key)
+    return field("email"), field("name")
+
+
+def _frame_upload_error(data, email):
+    """(message, status) for an unusable upload, or None."""
+    if not email:
+        return "Email required", 400
+    if not data:
+        return "Empty frame", 400
+    if len(data) > FRAME_MAX_UPLOAD_BYTES:
+        return "Frame too large", 413
+    return None
+
+
+@app.route('/api/frames', methods=['POST'])
+def upload_frame_bytes():
+    """
+    Binary frame upload - the JPEG/WebP/PNG bytes as the request body, or
+    a multipart "frame" file. email/name go in the query string (or
+    X-Candidate-Email / X-Candidate-Name headers, or multipart fields).
+    /api/upload-frame keeps accepting base64 JSON from old clients.
+    """
+    if request.content_length and request.content_length > FRAME_MAX_UPLOAD_BYTES:
+        return jsonify({"error": "Frame too large"}), 413
+
+    form = None
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("frame")
+        data = upload.read(FRAME_MAX_UPLOAD_BYTES + 1) if upload else None
+        form = request.form
+    elif request.mimetype in FRAME_UPLOAD_TYPES:
+        # Read straight off the socket - never a base64 string or JSON document
+        data = request.stream.read(FRAME_MAX_UPLOAD_BYTES + 1)
+    else:
+        return jsonify({"error": f"Unsupported Content-Type, use one of {FRAME_UPLOAD_TYPES} or multipart"}), 415
+
+    email, name = _frame_upload_meta(request.args, request.headers, form)
+    error = _frame_upload_error(data, email)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+
+    FRAME_INGEST.submit(email, name, data)
+    return jsonify({"message": "Frame received"}), 202
+
+
+@app.route('/api/blobs/<sha>', methods=['GET'])
+def get_blob(sha):
+    if not re.fullmatch(r"[0-9a-f]{64}", sha):
+        return jsonify({"error": "Invalid blob id"}), 400
+
+    # Content-addressed: a blob never changes, so its id is a perfect ETag
+    if request.if_none_match.contains(sha):
+        response = app.response_class(status=304)
+    else:
+        data, content_type = BLOBS.get(sha)
+        if data is None:
+            return jsonify({"error": "Blob not found"}), 404
+        response = app.response_class(data, mimetype=content_type)
+    response.set_etag(sha)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
+def _blob_url(sha):
+    return url_for('get_blob', sha=sha, _external=True)
+
+
+def _with_image_url(doc, blob_url=None):
+    # Frames stored as blobs are served by URL; old documents still carry the data URL
+    if doc.get("image_ref"):
+        doc["image"] = (blob_url or _blob_url)(doc["image_ref"])
+    return doc
+
+FRAMES_PAGE_SIZE = 100
+FRAMES_MAX_PAGE_SIZE = 1000
+
+
+def _frame_json(doc, blob_url=None):
+    doc["id"] = str(doc.pop("_id"))
+    return _with_image_url(doc, blob_url)
+
+
+def _frames_params(args):
+    """Parsed /api/frames query: (query, projection, limit, ndjson). Raises ValueError."""
+    query = frames_query(
+        email=args.get("email"),
+        since=args.get("since"),
+        until=args.get("until"),
+        cursor=args.get("cursor")
     )
+    limit = int(args.get("limit", FRAMES_PAGE_SIZE))
+    ndjson = args.get("format") == "ndjson"
+    if ndjson:
+        limit = limit if limit > 0 and "limit" in args else 0
+    else:
+        limit = min(max(1, limit), FRAMES_MAX_PAGE_SIZE)
+
+    projection = None if args.get("include_image") == "1" else FRAME_METADATA
+    return query, projection, limit, ndjson
+
+
+def _frames_page(docs, limit, blob_url=None):
+    # docs holds up to limit + 1 frames - the extra one only says there is a next page
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = encode_cursor(docs[-1]) if has_more else None
+    return {
+        "frames": [_frame_json(d, blob_url) for d in docs],
+        "next_cursor": next_cursor
+    }
+
 
-    return jsonify({"message": "Frame saved"})
 @app.route('/api/frames', methods=['GET'])
 def get_frames():
-    frames = list(db.frames.find({}, {"_id": 0}))
-    return jsonify(frames)
+    """
+    Query params:
+      email, since, until  - filters (since/until are ISO timestamps)
+      cursor               - next_cursor from the previous page
+      limit                - page size (default 100, max 1000)
+      include_image=1      - also return inline base64 images of old frames
+      format=ndjson        - stream every matching frame, one JSON object per line
+    """
+    try:
+        query, projection, limit, ndjson = _frames_params(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    if ndjson:
+        cursor = db.frames.find(query, projection).sort(FRAME_SORT).batch_size(500)
+        if limit:
+            cursor = cursor.limit(limit)
+        return _json_stream((_frame_json(doc) for doc in cursor), ndjson=True)
 
+    docs = list(db.frames.find(query, projection).sort(FRAME_SORT).limit(limit + 1))
+    return _json_response(_frames_page(docs, limit))
 
-@app.route('/api/live', methods=['GET'])
-def get_live():
-    users = list(db.live.find({}, {"_id": 0}))
 
-    for u in users:
-        last_active = u.get("lastActive")
-        is_completed = u.get("isCompleted", False)
-        status = u.get("status", "")
-        
-        is_active = False
-        if not is_completed and status == "In Interview" and last_active:
-            try:
-                last_active_time = datetime.fromisoformat(last_active.replace("Z", ""))
-                if datetime.now() - last_active_time < timedelta(seconds=20):
-                    is_active = True
-            except Exception as e:
-                print("Time parse error:", e)
-        
-        # Do not send frozen image if disconnected or completed
-        if not is_active and "image" in u:
+
+def _is_active(u, now=None):
+    last_active = u.get("lastActive")
+    if u.get("isCompleted", False) or u.get("status", "") != "In Interview" or not last_active:
+        return False
+    try:
+        last_active_time = datetime.fromisoformat(last_active.replace("Z", ""))
+    except Exception as e:
+        print("Time parse error:", e)
+        return False
+    return (now or datetime.now()) - last_active_time < timedelta(seconds=LIVE_ACTIVE_SECONDS)
+
+
+def _live_view(u, now=None):
+    """A live document as the dashboard sees it: isActive set, no frozen image."""
+    is_active = _is_active(u, now)
+
+    # Do not send frozen image if disconnected or completed
+    if not is_active:
+        if "image" in u:
             u["image"] = None
-            
-        u["isActive"] = is_active
+        u.pop("image_ref", None)
+
+    u["isActive"] = is_active
+    return u
+
 
+def _live_snapshot(docs=None, blob_url=None):
+    now = datetime.now()
+    if docs is None:
+        docs = _live_find()
+    return [_live_view(_with_image_url(u, blob_url), now) for u in docs]
+
+
+# ------------------ JSON responses ------------------
+def _response_encoding(size=None):
+    """gzip/br per Accept-Encoding - None for bodies too small to be worth it."""
+    return choose_encoding(request.headers.get("Accept-Encoding"), size)
+
+
+def _encoded_etag(tag, encoding):
+    # Each encoding is a different representation, so it gets its own tag
+    return f"{tag}-{encoding}" if encoding else tag
+
+
+def _held_etag(tag, encoding, if_none_match):
+    """
+    Which of this version's tags If-None-Match holds, or None. A streamed
+    body's encoding is only known once it is read (small ones go out
+    uncompressed), so either the encoded or the identity tag is a match.
+    """
+    for candidate in (_encoded_etag(tag, encoding), tag):
+        if if_none_match.contains(candidate):
+            return candidate
+    return None
+
+
+def _json_headers(response, encoding=None, etag=None):
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _not_modified(etag):
+    return _json_headers(app.response_class(status=304), etag=etag)
+
+
+def _json_response(payload, status=200, conditional=False):
+    """
+    `payload` through the shared encoder, compressed when the client
+    accepts it. conditional=True adds an ETag over the body - an unchanged
+    list costs a 304 instead of the full payload.
+    """
+    body = dumps(payload)
+    encoding = _response_encoding(len(body))
+    etag = None
+    if conditional:
+        etag = _encoded_etag(generate_etag(body), encoding)
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+    response = app.response_class(compress(body, encoding), status=status, mimetype="application/json")
+    return _json_headers(response, encoding, etag)
+
+
+def _json_stream(items, ndjson=False, etag=None):
+    """
+    A JSON array (or NDJSON) serialized and compressed chunk by chunk as
+    `items` is read. `etag` gets the encoding actually applied appended.
+    """
+    head, rest, size = prefetch(items)
+    encoding = _response_encoding(size)
+    chunks = stream_ndjson(head, rest, encoding) if ndjson else stream_json_array(head, rest, encoding)
+    response = app.response_class(
+        stream_with_context(chunks), mimetype="application/x-ndjson" if ndjson else "application/json"
+    )
+    return _json_headers(response, encoding, etag and _encoded_etag(etag, encoding))
+
+
+@app.route('/api/live', methods=['GET'])
+def get_live():
     # Return all users so dashboard can display total, active, and completed candidates correctly
-    return jsonify(users)
-@app.route('/api/save-user', methods=['POST'])
-def save_user():
-    data = request.json
+    return _json_response(_live_snapshot(), conditional=True)
+
+
+# ------------------ Admin dashboard event stream ------------------
+# Events are also published per candidate email, for /api/live/<email> long-polls
+LIVE_EVENTS = EventBroker(topic_of=lambda event, data: data.get("email"))
+
+
+def _publish_live(event, data):
+    # With change streams, writes to a watched collection already arrive through the feed
+    collection = "login_history" if event == "login" else "live"
+    if COMPONENTS.is_ready("live_feed"):
+        feed = COMPONENTS.get("live_feed")
+        if feed.active and collection in feed.handlers:
+            return
+    LIVE_EVENTS.publish(event, data)
+
+
+def _login_event(doc):
+    login_time = doc.get("loginTime")
+    if hasattr(login_time, "isoformat"):
+        login_time = login_time.isoformat() + "Z"
+    return {"name": doc.get("name"), "email": doc.get("email"), "loginTime": login_time}
+
+
+def _live_change(change):
+    doc = change.get("fullDocument")
+    if not doc or not doc.get("email"):
+        return None
+    doc.pop("_id", None)
+    image_ref = doc.get("image_ref")
+    view = _live_view(doc)
+
+    if change.get("operationType") == "update":
+        fields = set(change.get("updateDescription", {}).get("updatedFields", {}))
+        if fields <= {"lastActive"}:
+            return "heartbeat", {"email": view["email"], "lastActive": view.get("lastActive"), "isActive": view["isActive"]}
+        if "image_ref" in fields and fields <= {"image_ref", "image_type", "image_bytes", "image_hash", "lastActive"}:
+            return "frame", {"email": view["email"], "image_ref": image_ref}
+    return "live", view
+
+
+def _login_change(change):
+    if change.get("operationType") != "insert":
+        return None
+    return "login", _login_event(change.get("fullDocument") or {})
+
+
+def _render_live_event(message, blob_url=None):
+    event_id, event, data = message
+    data = dict(data)
+    if data.get("image_ref"):
+        _with_image_url(data, blob_url)
+    return format_sse(event_id, event, data)
+
 
-    db.final_results.insert_one({
+@app.route('/api/live/events', methods=['GET'])
+def live_events():
+    """
+    Server-Sent Events for the admin dashboard:
+      snapshot  - full /api/live list (on connect, or when the client fell behind)
+      live      - a candidate's changed fields
+      heartbeat - {email, lastActive, isActive}
+      frame     - {email, image} for a new webcam frame
+      login     - a new login_history entry
+    Reconnecting clients send Last-Event-ID and only get what they missed.
+    """
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_event_id = None
+
+    sub, missed, current_id = LIVE_EVENTS.subscribe(last_event_id)
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            if missed is None:
+                yield format_sse(current_id, "snapshot", _live_snapshot())
+            else:
+                for message in missed:
+                    yield _render_live_event(message)
+
+            while True:
+                if sub.overflowed:
+                    # Too far behind - drop the backlog and resync
+                    while sub.get(0) is not None:
+                        pass
+                    sub.overflowed = False
+                    yield format_sse(LIVE_EVENTS.last_id, "snapshot", _live_snapshot())
+
+                message = sub.get(SSE_KEEPALIVE_SECONDS)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _render_live_event(message)
+        finally:
+            LIVE_EVENTS.unsubscribe(sub)
+
+    response = app.response_class(stream_with_context(generate()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"    # don't let nginx buffer the stream
+    return response
+
+
+def _final_result(data):
+    return {
         "name": data.get("name"),
         "email": data.get("email"),
         "score": data.get("score")
-    })
+    }
+
+
+# ------------------ Candidate status (long-poll) ------------------
+LIVE_STATUS_PROJECTION = {"_id": 0, "email": 1, "status": 1, "isCompleted": 1}
+LIVE_STATUS_MAX_WAIT = 30
+# Each held long-poll keeps a WSGI worker thread busy; past this many, ?wait answers right away
+LIVE_STATUS_MAX_WAITERS = int(os.getenv("LIVE_STATUS_MAX_WAITERS", "32"))
+_live_status_waiters = threading.BoundedSemaphore(max(0, LIVE_STATUS_MAX_WAITERS))
+
+
+def _live_status(doc):
+    # No lastActive - the status only changes when the interview does
+    return {"email": doc.get("email"), "status": doc.get("status"), "isCompleted": bool(doc.get("isCompleted"))}
+
+
+def _live_status_etag(status):
+    return generate_etag(json.dumps(status, sort_keys=True).encode("utf-8"))
+
+
+def _live_status_wait(args):
+    """Seconds to hold the request (?wait=N, capped). Raises ValueError."""
+    return min(max(0.0, float(args.get("wait", 0))), LIVE_STATUS_MAX_WAIT)
+
+
+def _concerns(message, email):
+    # Status changes (admin stop, completion, restart) are published as "live" events
+    _, event, data = message
+    return event == "live" and data.get("email") == email
+
+
+def _wait_for_change(sub, email, deadline):
+    """True once an event about `email` arrives (or events were dropped), False at the deadline."""
+    while True:
+        remaining = deadline - time.monotonic()
+        message = sub.get(remaining) if remaining > 0 else None
+        if message is None:
+            return False
+        if sub.overflowed or _concerns(message, email):
+            sub.overflowed = False
+            return True
+
+
+def _read_live_status(email):
+    if PRESENCE_ENABLED:
+        doc = PRESENCE.get(email)
+    else:
+        doc = db.live.find_one({"email": email}, LIVE_STATUS_PROJECTION)
+    return _live_status(doc) if doc else None
+
+
+@app.route('/api/live/<email>', methods=['GET'])
+def get_live_status(email):
+    """
+    One candidate's {email, status, isCompleted} - a keyed lookup instead
+    of the whole /api/live list. Send If-None-Match with the last ETag to
+    get a 304 while nothing changed; add ?wait=N (seconds, max 30) to hold
+    the request until the status changes or N seconds pass. At most
+    LIVE_STATUS_MAX_WAITERS requests are held at once (each holds a worker
+    thread); the rest are answered immediately and simply poll again.
+    """
+    try:
+        wait = _live_status_wait(request.args)
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds"}), 400
+
+    if wait and not _live_status_waiters.acquire(blocking=False):
+        wait = 0
+
+    # Subscribed before the first read, so a change in between is not missed
+    sub = LIVE_EVENTS.subscribe(topic=email)[0] if wait else None
+    try:
+        deadline = time.monotonic() + wait
+        timed_out = False
+        while True:
+            status = _read_live_status(email)
+            if status is None:
+                return jsonify({"error": "Candidate not found"}), 404
+            etag = _live_status_etag(status)
+            if sub is None or timed_out or not request.if_none_match.contains(etag):
+                break
+
+            # Unchanged - wait for an event about this candidate, then read again.
+            # Read once more after a timeout too: writes from another process
+            # (no presence table, no change streams) publish no event here.
+            timed_out = not _wait_for_change(sub, email, deadline)
+    finally:
+        if sub is not None:
+            LIVE_EVENTS.unsubscribe(sub)
+            _live_status_waiters.release()
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(status)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["Access-Control-Expose-Headers"] = "ETag"
+    return response
+
+
+@app.route('/api/save-user', methods=['POST'])
+def save_user():
+    data = request.json
+
+    db.final_results.insert_one(_final_result(data))
 
     return jsonify({"message": "saved"})
 # @app.route('/api/upload-frame', methods=['POST'])
@@ -566,26 +1553,35 @@ def save_user():
 #     return jsonify({"message": "frame saved"})
 @app.route('/api/completed', methods=['GET'])
 def get_completed():
-    users = list(db.live.find({"status": "Completed"}, {"_id": 0}))
-    return jsonify(users)
+    # Migrated frames only carry image_ref - resolve it like /api/live does
+    users = [_with_image_url(u) for u in _live_find({"status": "Completed"})]
+    return _json_response(users)
 
 
 
 
 
+def _admin_stop_update():
+    return {"isCompleted": True, "status": "Stopped by Admin", "lastActive": datetime.now().isoformat()}
+
+
 @app.route('/api/admin-stop', methods=['POST'])
 def admin_stop():
     data = request.json
     email = data.get("email")
 
-    db.live.update_one(
-        {"email": email},
-        {"$set": {"isCompleted": True, "status": "Stopped by Admin", "lastActive": datetime.now().isoformat()}},
-        upsert=True
-    )
+    update = _admin_stop_update()
+    _live_update(email, update)
+    _publish_live("live", {"email": email, **update, "image": None, "isActive": False})
 
     return jsonify({"message": "Interview stopped"})
+# Scoring worker processes re-import this module when spawned - they must not start loading too
+if multiprocessing.current_process().name == "MainProcess":
+    if STARTUP_MODE == "eager":
+        COMPONENTS.load_all()
+    elif STARTUP_MODE == "background":
+        COMPONENTS.start_background()
+
 if __name__ == '__main__':
   
     app.run(host='0.0.0.0', debug=True, port=5000)
-
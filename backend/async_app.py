@@ -0,0 +1,480 @@
+"""
+Asyncio serving mode for the Mongo-bound endpoints.
+
+    hypercorn async_app:application --bind 0.0.0.0:5000
+
+/api/live, /api/live/<email>, /api/live/events, /api/upload-frame,
+/api/frames (GET and POST), /api/all-users, /api/completed,
+/api/admin-stop, /api/save-user and the login routes are served by
+Quart with pymongo's AsyncMongoClient, so a waiting request costs a
+coroutine instead of a thread. Decisions and payloads come from the
+same helpers app.py uses.
+
+Every other route (scoring, career guidance, blobs, /health) goes to the
+Flask app, which runs on the event loop's executor threads - CPU-bound
+scoring never blocks the loop.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from pymongo import AsyncMongoClient
+from quart import Quart, jsonify, request
+from quart_cors import cors
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import generate_etag
+
+import app as backend
+from database.frames import FRAME_SORT
+from database.login_history import login_history_version_async
+from utils.live_events import format_sse
+from utils.passwords import HasherBusy
+from utils.responses import aprefetch, astream_json_array, astream_ndjson, choose_encoding, compress, dumps
+
+# Flask fallback (scoring, career guidance, ...) runs on the loop's default executor
+ASYNC_WSGI_THREADS = int(os.getenv("ASYNC_WSGI_THREADS", "16"))
+# Short blocking calls from async routes: presence table, blob writes
+ASYNC_BLOCKING_THREADS = int(os.getenv("ASYNC_BLOCKING_THREADS", "8"))
+ASYNC_MAX_BODY_BYTES = 16 * 1024 * 1024
+
+app = cors(Quart(__name__), allow_origin="*")
+adb = None
+_BLOCKING = ThreadPoolExecutor(max_workers=ASYNC_BLOCKING_THREADS, thread_name_prefix="async-blocking")
+
+
+@app.errorhandler(HasherBusy)
+async def _hasher_busy(e):
+    response = jsonify({"error": "Server busy, please try again"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
+@app.before_serving
+async def _startup():
+    global adb
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=ASYNC_WSGI_THREADS, thread_name_prefix="flask"))
+    adb = AsyncMongoClient(backend.MONGO_URI)['user_database']
+
+
+@app.after_serving
+async def _shutdown():
+    await adb.client.close()
+    _BLOCKING.shutdown(wait=True)
+
+
+async def _blocking(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(_BLOCKING, partial(fn, *args, **kwargs))
+
+
+def _blob_urls():
+    # Same URLs Flask's url_for('get_blob', _external=True) builds
+    host_url = request.host_url
+    return lambda sha: f"{host_url}api/blobs/{sha}"
+
+
+# ------------------ JSON responses (same encoder and rules as app.py) ------------------
+def _response_encoding(size=None):
+    return choose_encoding(request.headers.get("Accept-Encoding"), size)
+
+
+def _json_headers(response, encoding=None, etag=None):
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _not_modified(etag):
+    return _json_headers(app.response_class("", status=304), etag=etag)
+
+
+def _json_response(payload, conditional=False):
+    body = dumps(payload)
+    encoding = _response_encoding(len(body))
+    etag = None
+    if conditional:
+        etag = backend._encoded_etag(generate_etag(body), encoding)
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+    response = app.response_class(compress(body, encoding), mimetype="application/json")
+    return _json_headers(response, encoding, etag)
+
+
+async def _json_stream(items, ndjson=False, etag=None):
+    """JSON array (or NDJSON) from an async cursor, compressed chunk by chunk; `etag` gets the encoding appended."""
+    head, rest, size = await aprefetch(items)
+    encoding = _response_encoding(size)
+    chunks = astream_ndjson(head, rest, encoding) if ndjson else astream_json_array(head, rest, encoding)
+    response = app.response_class(chunks, mimetype="application/x-ndjson" if ndjson else "application/json")
+    response.timeout = None
+    return _json_headers(response, encoding, etag and backend._encoded_etag(etag, encoding))
+
+
+# ------------------ Live state (db.live) ------------------
+async def _live_get(email):
+    if backend.PRESENCE_ENABLED:
+        return await _blocking(backend.PRESENCE.get, email)
+    return await adb.live.find_one({"email": email}, {"_id": 0})
+
+
+async def _live_update(email, fields, unset=(), upsert=True):
+    if backend.PRESENCE_ENABLED:
+        await _blocking(backend.PRESENCE.update, email, fields, unset=unset, upsert=upsert)
+        return
+    update = {"$set": fields}
+    if unset:
+        update["$unset"] = {f: "" for f in unset}
+    await adb.live.update_one({"email": email}, update, upsert=upsert)
+
+
+async def _live_find(query=None):
+    if backend.PRESENCE_ENABLED:
+        return await _blocking(backend.PRESENCE.snapshot, query)
+    return await adb.live.find(query or {}, {"_id": 0}).to_list(None)
+
+
+async def _live_snapshot(blob_url):
+    return backend._live_snapshot(await _live_find(), blob_url)
+
+
+async def _record_login(name, email):
+    entry = await backend.LOGIN_RECORDER.record_async(adb.login_history, name, email)
+    if entry is not None:
+        backend._publish_live("login", backend._login_event(entry))
+    return entry
+
+
+# ------------------ Routes ------------------
+@app.route('/google-login', methods=['POST'])
+async def google_login():
+    data = await request.get_json()
+    token = data.get('credential')
+
+    try:
+        idinfo = await _blocking(backend.GOOGLE_VERIFIER.verify, token)
+
+        google_user = backend._google_user(idinfo)
+        name, email = google_user["name"], google_user["email"]
+
+        if not await adb.users.find_one({"email": email}):
+            await adb.users.insert_one(google_user)
+
+        await _record_login(name, email)
+
+        return jsonify({
+            "message": "Google Login successful",
+            "user": {
+                "name": name,
+                "email": email
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"Google Login Error: {e}")
+        return jsonify({"error": str(e)}), 400
+
+
+@app.route('/signup', methods=['POST'])
+async def signup():
+    data = await request.get_json()
+    name = data.get('name')
+    email = data.get('email')
+    password = data.get('password')
+
+    if not backend._allowed_provider(email):
+        return jsonify({"error": "Use valid email provider"}), 400
+
+    if not name or not email or not password:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    if await adb.users.find_one({"email": email}):
+        return jsonify({"error": "User already exists"}), 400
+
+    await adb.users.insert_one({
+        "name": name,
+        "email": email,
+        "password": await backend.PASSWORDS.hash_async(password)
+    })
+    return jsonify({"message": "User created successfully"}), 201
+
+
+@app.route('/login', methods=['POST'])
+async def login():
+    data = await request.get_json()
+    email = data.get('email')
+    password = data.get('password')
+
+    if not backend._allowed_provider(email):
+        return jsonify({"error": "Use valid email provider"}), 400
+
+    if not email or not password:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    user = await adb.users.find_one({"email": email})
+
+    if user and await backend.PASSWORDS.verify_async(user.get('password'), password):
+        if backend.PASSWORDS.needs_rehash(user['password']):
+            # Saved from the hashing thread, through the sync client
+            backend.PASSWORDS.rehash_later(password, lambda new_hash: backend.users_collection.update_one(
+                {"_id": user["_id"], "password": user["password"]},
+                {"$set": {"password": new_hash}}
+            ))
+
+        await _record_login(user['name'], user['email'])
+
+        return jsonify({
+            "message": "Login successful",
+            "user": {
+                "name": user['name'],
+                "email": user['email']
+            }
+        }), 200
+
+    return jsonify({"error": "Invalid email or password"}), 401
+
+
+@app.route('/api/live', methods=['POST'])
+async def update_live():
+    data = await request.get_json()
+
+    if not data.get("email"):
+        return jsonify({"error": "Email required"}), 400
+
+    existing = await _live_get(data.get("email"))
+    fields, upsert, event, event_data, message = backend._live_post(data, existing)
+
+    await _live_update(data.get("email"), fields, upsert=upsert)
+    backend._publish_live(event, event_data)
+
+    return jsonify({"message": message})
+
+
+@app.route('/api/live', methods=['GET'])
+async def get_live():
+    return _json_response(await _live_snapshot(_blob_urls()), conditional=True)
+
+
+@app.route('/api/all-users', methods=['GET'])
+async def get_all_users():
+    version = await login_history_version_async(adb.login_history)
+    held = backend._held_etag(version, _response_encoding(), request.if_none_match)
+    if held:
+        return _not_modified(held)
+    cursor = adb.login_history.find({}, {"_id": 0}).batch_size(1000)
+    return await _json_stream(cursor, etag=version)
+
+
+@app.route('/api/upload-frame', methods=['POST'])
+async def upload_frame():
+    data = await request.get_json()
+
+    image = data.get("image")
+    if not isinstance(image, str) or not image:
+        return jsonify({"error": "Invalid image"}), 400
+
+    # Off the loop: submit() processes inline when the ingest queue is full
+    await _blocking(backend.FRAME_INGEST.submit, data.get("email"), data.get("name"), image)
+
+    return jsonify({"message": "Frame received"}), 202
+
+
+@app.route('/api/frames', methods=['POST'])
+async def upload_frame_bytes():
+    if request.content_length and request.content_length > backend.FRAME_MAX_UPLOAD_BYTES:
+        return jsonify({"error": "Frame too large"}), 413
+
+    form = None
+    if request.mimetype == "multipart/form-data":
+        upload = (await request.files).get("frame")
+        data = upload.read(backend.FRAME_MAX_UPLOAD_BYTES + 1) if upload else None
+        form = await request.form
+    elif request.mimetype in backend.FRAME_UPLOAD_TYPES:
+        body = bytearray()
+        async for chunk in request.body:
+            body += chunk
+            if len(body) > backend.FRAME_MAX_UPLOAD_BYTES:
+                return jsonify({"error": "Frame too large"}), 413
+        data = bytes(body)
+    else:
+        return jsonify({"error": f"Unsupported Content-Type, use one of {backend.FRAME_UPLOAD_TYPES} or multipart"}), 415
+
+    email, name = backend._frame_upload_meta(request.args, request.headers, form)
+    error = backend._frame_upload_error(data, email)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+
+    await _blocking(backend.FRAME_INGEST.submit, email, name, data)
+    return jsonify({"message": "Frame received"}), 202
+
+
+@app.route('/api/frames', methods=['GET'])
+async def get_frames():
+    try:
+        query, projection, limit, ndjson = backend._frames_params(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    blob_url = _blob_urls()
+
+    if ndjson:
+        cursor = adb.frames.find(query, projection).sort(FRAME_SORT).batch_size(500)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        async def frames():
+            async for doc in cursor:
+                yield backend._frame_json(doc, blob_url)
+
+        return await _json_stream(frames(), ndjson=True)
+
+    docs = await adb.frames.find(query, projection).sort(FRAME_SORT).limit(limit + 1).to_list(None)
+    return _json_response(backend._frames_page(docs, limit, blob_url))
+
+
+@app.route('/api/live/events', methods=['GET'])
+async def live_events():
+    """Same event stream as app.py, one coroutine per dashboard instead of a thread."""
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_event_id = None
+
+    sub, missed, current_id = backend.LIVE_EVENTS.subscribe(last_event_id, loop=asyncio.get_running_loop())
+    blob_url = _blob_urls()
+
+    async def generate():
+        try:
+            yield b"retry: 3000\n\n"
+            if missed is None:
+                yield format_sse(current_id, "snapshot", await _live_snapshot(blob_url)).encode()
+            else:
+                for message in missed:
+                    yield backend._render_live_event(message, blob_url).encode()
+
+            while True:
+                if sub.overflowed:
+                    # Too far behind - drop the backlog and resync
+                    sub.drain()
+                    sub.overflowed = False
+                    yield format_sse(backend.LIVE_EVENTS.last_id, "snapshot", await _live_snapshot(blob_url)).encode()
+
+                message = await sub.get(backend.SSE_KEEPALIVE_SECONDS)
+                if message is None:
+                    yield b": keepalive\n\n"
+                    continue
+                yield backend._render_live_event(message, blob_url).encode()
+        finally:
+            backend.LIVE_EVENTS.unsubscribe(sub)
+
+    response = app.response_class(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    response.timeout = None    # open until the dashboard goes away
+    return response
+
+
+async def _read_live_status(email):
+    if backend.PRESENCE_ENABLED:
+        doc = await _blocking(backend.PRESENCE.get, email)
+    else:
+        doc = await adb.live.find_one({"email": email}, backend.LIVE_STATUS_PROJECTION)
+    return backend._live_status(doc) if doc else None
+
+
+async def _wait_for_change(sub, email, deadline):
+    loop = asyncio.get_running_loop()
+    while True:
+        remaining = deadline - loop.time()
+        message = await sub.get(remaining) if remaining > 0 else None
+        if message is None:
+            return False
+        if sub.overflowed or backend._concerns(message, email):
+            sub.overflowed = False
+            return True
+
+
+@app.route('/api/live/<email>', methods=['GET'])
+async def get_live_status(email):
+    try:
+        wait = backend._live_status_wait(request.args)
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds"}), 400
+
+    loop = asyncio.get_running_loop()
+    # Waiting here costs a coroutine, not a thread, so no LIVE_STATUS_MAX_WAITERS cap
+    sub = backend.LIVE_EVENTS.subscribe(loop=loop, topic=email)[0] if wait else None
+    try:
+        deadline = loop.time() + wait
+        timed_out = False
+        while True:
+            status = await _read_live_status(email)
+            if status is None:
+                return jsonify({"error": "Candidate not found"}), 404
+            etag = backend._live_status_etag(status)
+            if sub is None or timed_out or not request.if_none_match.contains(etag):
+                break
+            timed_out = not await _wait_for_change(sub, email, deadline)
+    finally:
+        if sub is not None:
+            backend.LIVE_EVENTS.unsubscribe(sub)
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class("", status=304)
+    else:
+        response = jsonify(status)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["Access-Control-Expose-Headers"] = "ETag"
+    return response
+
+
+@app.route('/api/save-user', methods=['POST'])
+async def save_user():
+    data = await request.get_json()
+    await adb.final_results.insert_one(backend._final_result(data))
+    return jsonify({"message": "saved"})
+
+
+@app.route('/api/completed', methods=['GET'])
+async def get_completed():
+    blob_url = _blob_urls()
+    users = [backend._with_image_url(u, blob_url) for u in await _live_find({"status": "Completed"})]
+    return _json_response(users)
+
+
+@app.route('/api/admin-stop', methods=['POST'])
+async def admin_stop():
+    data = await request.get_json()
+    email = data.get("email")
+
+    update = backend._admin_stop_update()
+    await _live_update(email, update)
+    backend._publish_live("live", {"email": email, **update, "image": None, "isActive": False})
+
+    return jsonify({"message": "Interview stopped"})
+
+
+# ------------------ ASGI entry point ------------------
+FLASK = AsyncioWSGIMiddleware(backend.app, max_body_size=ASYNC_MAX_BODY_BYTES)
+_ROUTES = app.url_map.bind("localhost")
+
+
+def _serves(scope):
+    try:
+        _ROUTES.match(scope["path"], method=scope["method"])
+        return True
+    except HTTPException:
+        return False
+
+
+async def application(scope, receive, send):
+    # Routes defined above are served here, everything else by the Flask app
+    if scope["type"] == "http" and not _serves(scope):
+        return await FLASK(scope, receive, send)
+    return await app(scope, receive, send)
@@ -0,0 +1,32 @@
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from database.session_totals import backfill
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild the per-session score totals used by /api/career-guidance from db.results."
+    )
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI"), help="default: MONGO_URI from .env")
+    parser.add_argument("--db", default="user_database")
+    parser.add_argument("--batch-size", type=int, default=1000, help="sessions per bulk_write")
+    args = parser.parse_args()
+
+    if not args.uri:
+        raise RuntimeError("MONGO_URI not set")
+
+    db = MongoClient(args.uri)[args.db]
+    start = time.perf_counter()
+    sessions = backfill(db, batch_size=args.batch_size)
+    print(f"✅ Rebuilt totals for {sessions} sessions in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
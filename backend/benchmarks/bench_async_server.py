@@ -0,0 +1,146 @@
+"""
+Connections/sec of the sync Flask server against the async server
+(async_app.py) on the Mongo-bound endpoints.
+
+Starts both servers as subprocesses against the same (local) mongod, then
+opens `concurrency` connections at a time - one request per connection -
+and reports connections/sec, latency percentiles and errors for each.
+
+Run from the backend folder (needs a real mongod, mongomock is in-process only):
+    python benchmarks/bench_async_server.py --mongo-uri mongodb://localhost:27017
+        [--endpoints heartbeat all-users frame] [--concurrency 100 500 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_suite import make_frame, summarize
+
+SERVERS = {
+    # How `python app.py` serves, minus the debugger/reloader
+    "sync": [sys.executable, "-c",
+             "import sys, app; app.app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"],
+    "async": [sys.executable, "-m", "hypercorn", "async_app:application", "--bind", "127.0.0.1:{port}"],
+}
+
+
+def start_server(kind, port, env):
+    cmd = [part.format(port=port) for part in SERVERS[kind]]
+    if kind == "sync":
+        cmd.append(str(port))
+    return subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+
+async def request(port, method, path, body=None):
+    """One request on a fresh connection. Returns the status code."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nConnection: close\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n")
+        writer.write(head.encode() + payload)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def wait_ready(port, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if await request(port, "GET", "/health") == 200:
+                return
+        except (OSError, IndexError, ValueError):
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"server on port {port} not ready after {timeout}s")
+
+
+async def run_load(port, make_request, n, concurrency):
+    latencies, errors = [], 0
+    counter = iter(range(n))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, path, body = make_request(i)
+            t0 = time.perf_counter()
+            try:
+                status = await request(port, method, path, body)
+            except (OSError, IndexError, ValueError):
+                status = 0
+            latencies.append(time.perf_counter() - t0)
+            if status // 100 != 2:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, time.perf_counter() - start)
+    result["connections_per_s"] = result.pop("throughput_rps")
+    result["errors"] = errors
+    return result
+
+
+def endpoints(users, image):
+    return {
+        "heartbeat": lambda i: ("POST", "/api/live", {
+            "email": f"bench{i % users}@gmail.com", "name": "Bench", "status": "In Interview", "isCompleted": False
+        }),
+        "all-users": lambda i: ("GET", "/api/all-users", None),
+        "live": lambda i: ("GET", "/api/live", None),
+        "frame": lambda i: ("POST", "/api/upload-frame", {
+            "email": f"bench{i % users}@gmail.com", "name": "Bench", "image": image
+        }),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async server connections/sec")
+    parser.add_argument("--mongo-uri", required=True)
+    parser.add_argument("--endpoints", nargs="+", default=["heartbeat", "all-users", "frame"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[100, 500, 2000])
+    parser.add_argument("--requests", type=int, default=5000, help="requests per endpoint and level")
+    parser.add_argument("--users", type=int, default=500, help="distinct candidates sending heartbeats")
+    parser.add_argument("--servers", nargs="+", default=["sync", "async"], choices=list(SERVERS))
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--out", default=None, help="JSON output path")
+    args = parser.parse_args()
+
+    env = dict(os.environ, MONGO_URI=args.mongo_uri, STARTUP_MODE="background")
+    make = endpoints(args.users, make_frame(320, 240, 70))
+
+    results = {}
+    for offset, kind in enumerate(args.servers):
+        port = args.port + offset
+        server = start_server(kind, port, env)
+        try:
+            asyncio.run(wait_ready(port))
+            for name in args.endpoints:
+                for concurrency in args.concurrency:
+                    result = asyncio.run(run_load(port, make[name], args.requests, concurrency))
+                    results.setdefault(name, {}).setdefault(str(concurrency), {})[kind] = result
+                    print(f"{kind:5s} {name:10s} c={concurrency:5d}  "
+                          f"{result['connections_per_s']:8.1f} conn/s  p95 {result['p95_ms']:8.1f} ms  "
+                          f"errors {result['errors']}")
+        finally:
+            server.terminate()
+            server.wait(30)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Results written to", args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Latency / throughput of the embedder backends at batch sizes 1, 8 and 64.
+Backends that are not available (e.g. ONNX not exported yet) are skipped.
+
+Run from the backend folder:
+    python benchmarks/bench_embedders.py [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from utils.embedders import EMBEDDER_BACKENDS, load_embedder
+from utils.preprocessing import clean_text
+
+EMBEDDER_NAME = 'all-MiniLM-L6-v2'
+ONNX_DIR = os.path.join(BASE_DIR, 'model', 'onnx')
+DATASET_PATH = os.path.join(BASE_DIR, 'model', 'dataset_generated.csv')
+BATCH_SIZES = (1, 8, 64)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads (0 = default)")
+    args = parser.parse_args()
+
+    texts = [clean_text(a) for a in pd.read_csv(DATASET_PATH)['answer'].astype(str)]
+
+    print(f"{'backend':10s} {'batch':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'texts/s':>9s}")
+    for backend in EMBEDDER_BACKENDS:
+        try:
+            embedder = load_embedder(backend, EMBEDDER_NAME, ONNX_DIR, num_threads=args.threads)
+        except Exception as e:
+            print(f"{backend:10s} skipped ({e})")
+            continue
+
+        embedder.encode(texts[:8])   # warm-up
+
+        for batch_size in BATCH_SIZES:
+            timings = []
+            for i in range(args.repeat):
+                start = (i * batch_size) % max(1, len(texts) - batch_size)
+                batch = texts[start:start + batch_size]
+                t0 = time.perf_counter()
+                embedder.encode(batch, batch_size=batch_size)
+                timings.append(time.perf_counter() - t0)
+
+            timings = np.array(timings)
+            print(f"{backend:10s} {batch_size:5d} "
+                  f"{np.percentile(timings, 50) * 1e3:9.2f} "
+                  f"{np.percentile(timings, 95) * 1e3:9.2f} "
+                  f"{batch_size / timings.mean():9.1f}")
+
+
+if __name__ == "__main__":
+    main()
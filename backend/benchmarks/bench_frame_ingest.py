@@ -0,0 +1,109 @@
+"""
+Stored bytes per candidate-hour: raw uploads against the frame ingest
+stage (downscale + re-encode + near-duplicate drop).
+
+Simulates one candidate sending a webcam frame every --interval seconds
+for an hour: a mostly still head with sensor noise, moving every
+--move-every frames. Frames are synthetic, so treat the ratio as a rough
+guide and check it on real recordings with --frames-dir.
+
+Run from the backend folder:
+    python benchmarks/bench_frame_ingest.py [--width 1280 --height 720 --quality 92]
+        [--max-size 640x480 --ingest-quality 70 --max-distance 4]
+"""
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from database.blob_store import blob_id
+from utils.frame_ingest import FrameIngestor
+
+
+class MemoryBlobStore:
+    def __init__(self):
+        self.blobs = {}
+
+    def put(self, data, content_type=None):
+        sha = blob_id(data)
+        self.blobs[sha] = data
+        return sha
+
+
+def synthetic_frames(n, width, height, quality, move_every, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = width // 2, height // 2
+    for i in range(n):
+        if i and i % move_every == 0:
+            x += int(rng.integers(-width // 8, width // 8))
+            y += int(rng.integers(-height // 16, height // 16))
+        img = Image.new("RGB", (width, height), (90, 110, 130))
+        draw = ImageDraw.Draw(img)
+        r = height // 3
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=(215, 175, 150))
+        draw.rectangle((0, int(height * 0.85), width, height), fill=(45, 45, 50))
+
+        pixels = np.asarray(img, dtype=np.int16) + rng.integers(-6, 7, (height, width, 3))
+        buf = io.BytesIO()
+        Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(buf, format="JPEG", quality=quality)
+        yield buf.getvalue()
+
+
+def directory_frames(path):
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), "rb") as f:
+            yield f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame ingest storage savings per candidate-hour")
+    parser.add_argument("--interval", type=float, default=4.0, help="seconds between uploads")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--quality", type=int, default=92, help="JPEG quality of the uploaded frames")
+    parser.add_argument("--move-every", type=int, default=15, help="frames between head movements")
+    parser.add_argument("--frames-dir", default=None, help="use real frames (JPEG/PNG files) instead")
+    parser.add_argument("--max-size", default="640x480")
+    parser.add_argument("--ingest-quality", type=int, default=70)
+    parser.add_argument("--max-distance", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.frames_dir:
+        frames = list(directory_frames(args.frames_dir))
+    else:
+        n = int(3600 / args.interval)
+        frames = list(synthetic_frames(n, args.width, args.height, args.quality, args.move_every))
+
+    store = MemoryBlobStore()
+    outcomes = []
+    ingestor = FrameIngestor(
+        store, lambda email, name, image: outcomes.append(image),
+        max_size=tuple(int(v) for v in args.max_size.split("x")),
+        quality=args.ingest_quality, max_distance=args.max_distance
+    )
+
+    start = time.perf_counter()
+    for data in frames:
+        ingestor._process("bench@gmail.com", "Bench", "data:image/jpeg;base64," + base64.b64encode(data).decode())
+    elapsed = time.perf_counter() - start
+
+    raw = sum(len(f) for f in frames)
+    stored = sum(len(b) for b in store.blobs.values())
+    hours = len(frames) * args.interval / 3600
+    stats = ingestor.stats()
+    print(f"frames:          {len(frames)} ({stats['stored']} stored, {stats['duplicates']} near-duplicates dropped)")
+    print(f"raw bytes/hour:    {raw / hours / 1e6:8.2f} MB")
+    print(f"stored bytes/hour: {stored / hours / 1e6:8.2f} MB  ({raw / max(stored, 1):.1f}x less)")
+    print(f"ingest time:       {elapsed / len(frames) * 1000:8.2f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+/login throughput under concurrent clients: werkzeug hashing inline in the
+request thread (old behaviour) against the PasswordHasher pool with
+different worker counts, for each hash method given.
+
+Uses the Flask test client against mongomock, like run_suite.py.
+
+Run from the backend folder:
+    python benchmarks/bench_login.py [--requests 400] [--concurrency 32]
+        [--methods scrypt pbkdf2:sha256:600000] [--workers 1 2 4]
+"""
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from run_suite import import_app, run_endpoint
+from utils.passwords import PasswordHasher
+
+
+class InlineHasher(PasswordHasher):
+    """werkzeug called directly in the request thread."""
+
+    def __init__(self, method):
+        self.method = generate_password_hash("", method=method).split("$", 1)[0]
+        self.salt_length = 16
+
+    def hash(self, password):
+        return generate_password_hash(password, self.method, self.salt_length)
+
+    def verify(self, stored_hash, password):
+        return bool(stored_hash) and check_password_hash(stored_hash, password)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput with inline vs pooled password hashing")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--methods", nargs="+", default=["scrypt", "pbkdf2:sha256:600000"])
+    parser.add_argument("--workers", nargs="+", type=int, default=None,
+                        help="pool sizes to try (default: 1, 2, 4, ... up to the core count)")
+    args = parser.parse_args()
+
+    A = import_app(None)
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({1, *[2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus], cpus})
+
+    print(f"{args.requests} logins, {args.concurrency} concurrent clients, {cpus} cores\n")
+    print(f"{'method':26s} {'hashing':12s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+
+    for method in args.methods:
+        # Fresh users hashed with this method
+        A.users_collection.delete_many({})
+        password_hash = generate_password_hash("benchmark-pw", method=method)
+        A.users_collection.insert_many([
+            {"name": f"user{i}", "email": f"user{i}@gmail.com", "password": password_hash}
+            for i in range(args.users)
+        ])
+
+        def login(client, i):
+            return client.post('/login', json={"email": f"user{i % args.users}@gmail.com", "password": "benchmark-pw"})
+
+        configs = [("inline", InlineHasher(method))]
+        configs += [(f"pool x{w}", PasswordHasher(method=method, workers=w)) for w in workers]
+        for label, hasher in configs:
+            A.PASSWORDS = hasher
+            r = run_endpoint(A.app, login, args.requests, args.concurrency)
+            print(f"{method:26s} {label:12s} {r['throughput_rps']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} {r['p99_ms']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark of answer cleaning for 1, 1k and 100k strings:
+the original three-regex clean_text, the current clean_text, and the
+clean_texts batch API. Also checks that all three give identical output.
+
+Run from the backend folder:
+    python benchmarks/bench_preprocessing.py
+"""
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from utils.preprocessing import STOPWORDS, clean_text, clean_texts
+
+DATASET_PATH = os.path.join(BASE_DIR, 'model', 'dataset_generated.csv')
+SIZES = (1, 1_000, 100_000)
+
+
+def legacy_clean_text(text):
+    # The original implementation (uncompiled patterns, three passes)
+    if not isinstance(text, str):
+        return ""
+
+    text = text.lower()
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"[^a-z0-9\s]", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+
+    tokens = [w for w in text.split() if w not in STOPWORDS]
+    return " ".join(tokens)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    answers = pd.read_csv(DATASET_PATH)['answer'].astype(str).tolist()
+
+    print(f"{'strings':>8s} {'legacy':>12s} {'clean_text':>12s} {'clean_texts':>12s} {'speedup':>8s}")
+    for n in SIZES:
+        texts = (answers * (n // len(answers) + 1))[:n]
+        repeat = 200 if n == 1 else 5
+
+        expected = [legacy_clean_text(t) for t in texts]
+        assert [clean_text(t) for t in texts] == expected
+        assert clean_texts(texts) == expected
+
+        t_legacy = timed(lambda: [legacy_clean_text(t) for t in texts], repeat)
+        t_single = timed(lambda: [clean_text(t) for t in texts], repeat)
+        t_batch = timed(lambda: clean_texts(texts), repeat)
+
+        print(f"{n:8d} {t_legacy * 1e3:10.3f}ms {t_single * 1e3:10.3f}ms "
+              f"{t_batch * 1e3:10.3f}ms {t_legacy / t_batch:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Requests/sec of the scoring worker pool against the number of worker
+processes (1, 2, 4, ... up to the core count), with the in-process scorer
+as the baseline.
+
+Each client thread sends one answer at a time, like /api/submit-answer.
+
+Run from the backend folder:
+    python benchmarks/bench_scoring_workers.py [--seconds 10] [--clients 32]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import joblib
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from utils.embedders import load_embedder
+from utils.preprocessing import clean_text
+from utils.scoring_workers import ScoringWorkerPool, embed_and_classify
+
+EMBEDDER_NAME = 'all-MiniLM-L6-v2'
+MODEL_PATH = os.path.join(BASE_DIR, 'model', 'interview_semantic_clf.joblib')
+ONNX_DIR = os.path.join(BASE_DIR, 'model', 'onnx')
+DATASET_PATH = os.path.join(BASE_DIR, 'model', 'dataset_generated.csv')
+
+
+def drive(score_one, texts, clients, seconds):
+    done = [0] * clients
+    stop = time.perf_counter() + seconds
+
+    def client(idx):
+        i = idx
+        while time.perf_counter() < stop:
+            score_one(texts[i % len(texts)])
+            done[idx] += 1
+            i += clients
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(done) / (time.perf_counter() - start)
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    counts, n = [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    return counts + [cores]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--backend", default=os.getenv("EMBEDDER_BACKEND", "torch"))
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    args = parser.parse_args()
+
+    texts = [clean_text(a) for a in pd.read_csv(DATASET_PATH)['answer'].astype(str)]
+
+    # 🔹 Baseline: everything in this process, shared by all threads
+    embedder = load_embedder(args.backend, EMBEDDER_NAME, ONNX_DIR)
+    classifier = joblib.load(MODEL_PATH)
+
+    def in_process(text):
+        embed_and_classify(embedder, classifier, [text])
+
+    baseline = drive(in_process, texts, args.clients, args.seconds)
+    print(f"{'workers':>8s} {'req/s':>10s} {'speedup':>8s}")
+    print(f"{'inproc':>8s} {baseline:10.1f} {1.0:8.2f}")
+
+    config = {
+        "embedder_backend": args.backend,
+        "embedder_name": EMBEDDER_NAME,
+        "onnx_dir": ONNX_DIR,
+        "model_path": MODEL_PATH,
+    }
+    for n in worker_counts():
+        pool = ScoringWorkerPool(n, config, torch_threads=args.threads, health_interval=3600)
+        try:
+            rate = drive(lambda text: pool.run([text]), texts, args.clients, args.seconds)
+        finally:
+            pool.close()
+        print(f"{n:8d} {rate:10.1f} {rate / baseline:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
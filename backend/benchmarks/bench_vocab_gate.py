@@ -0,0 +1,81 @@
+"""
+Parity check + speed comparison of the vocabulary gate against the old
+`TFIDF_VEC.transform([cleaned]).nnz == 0` gibberish check.
+
+Run from the backend folder:
+    python benchmarks/bench_vocab_gate.py
+"""
+import os
+import sys
+import time
+
+import joblib
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from utils.preprocessing import clean_text
+from utils.vocab_gate import VocabularyGate
+
+VECTORIZER_PATH = os.path.join(BASE_DIR, 'model', 'vectorizer_calibrated.joblib')
+DATASETS = [
+    os.path.join(BASE_DIR, 'model', 'dataset_full.csv'),
+    os.path.join(BASE_DIR, 'model', 'dataset_generated.csv'),
+]
+
+# Off-topic / gibberish inputs the gate is meant to reject
+EXTRA_ANSWERS = [
+    "asdkjh qwelkj zxcmnb",
+    "lorem ipsum dolor sit amet",
+    "idk",
+    "blah blah blah",
+    "1234 5678",
+    "",
+]
+
+
+def timed(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(texts)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    gate = VocabularyGate(vectorizer)
+
+    answers = []
+    for path in DATASETS:
+        answers += pd.read_csv(path)['answer'].astype(str).tolist()
+    answers += EXTRA_ANSWERS
+    cleaned = [clean_text(a) for a in answers]
+
+    # 🔹 Parity - every decision must match the old check
+    old = [vectorizer.transform([c]).nnz != 0 for c in cleaned]
+    new = gate.accepts_many(cleaned)
+    mismatches = [c for c, o, n in zip(cleaned, old, new) if o != n]
+
+    print(f"Answers checked : {len(cleaned)}")
+    print(f"Accepted        : {sum(new)}  Rejected: {len(new) - sum(new)}")
+    print(f"Mismatches      : {len(mismatches)}")
+    for c in mismatches[:10]:
+        print("   ", repr(c))
+
+    # 🔹 Speed - per answer, the way predict_score_dict calls it
+    repeat = 3
+    t_old = timed(lambda xs: [vectorizer.transform([x]).nnz for x in xs], cleaned, repeat)
+    t_new = timed(lambda xs: [gate.accepts(x) for x in xs], cleaned, repeat)
+    t_batch = timed(gate.accepts_many, cleaned, repeat)
+
+    print(f"TF-IDF transform : {t_old * 1e6:8.1f} us/answer")
+    print(f"VocabularyGate   : {t_new * 1e6:8.1f} us/answer  ({t_old / t_new:.0f}x faster)")
+    print(f"Gate (batch)     : {t_batch * 1e6:8.1f} us/answer")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+End-to-end benchmark of the backend hot paths.
+
+Runs app.py in-process through Flask's test client against a local Mongo
+stand-in (mongomock by default, or a real local mongod with --mongo-uri),
+and reports p50/p95/p99 latency and throughput for:
+
+- predict_score_dict, stage by stage
+- /api/questions, /api/submit-answer, /api/career-guidance
+- /api/live GET + POST, /api/upload-frame
+
+Results are written as JSON so runs on different commits can be compared:
+
+    python benchmarks/run_suite.py --out before.json
+    git checkout <other commit>
+    python benchmarks/run_suite.py --out after.json --baseline before.json
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+CATEGORIES = ["HR", "Technical", "Programming", "Database", "AI/ML"]
+
+
+# ------------------ Setup ------------------
+def import_app(mongo_uri):
+    os.environ["STARTUP_MODE"] = "eager"
+    if mongo_uri:
+        os.environ["MONGO_URI"] = mongo_uri
+    else:
+        import mongomock
+        import pymongo
+        os.environ["MONGO_URI"] = "mongodb://localhost:27017"
+        pymongo.MongoClient = mongomock.MongoClient
+        _patch_mongomock_bulk_write(mongomock)
+        # mongomock has no working GridFS - keep frames on disk
+        os.environ.setdefault("BLOB_STORE", "filesystem")
+        os.environ.setdefault("BLOB_DIR", tempfile.mkdtemp(prefix="bench-blobs-"))
+
+    import app as backend_app
+    return backend_app
+
+
+def _patch_mongomock_bulk_write(mongomock):
+    """
+    pymongo >= 4.9 write models pass `sort` to mongomock's bulk builder,
+    which rejects it - apply the operations one by one instead.
+    """
+    from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateOne
+
+    def bulk_write(self, requests, ordered=True, **kwargs):
+        for op in requests:
+            if isinstance(op, InsertOne):
+                self.insert_one(op._doc)
+            elif isinstance(op, UpdateOne):
+                self.update_one(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, ReplaceOne):
+                self.replace_one(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, DeleteOne):
+                self.delete_one(op._filter)
+            else:
+                raise NotImplementedError(f"bulk_write {type(op).__name__}")
+
+    mongomock.collection.Collection.bulk_write = bulk_write
+
+
+def make_frame(width, height, quality):
+    from PIL import Image
+    pixels = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format="JPEG", quality=quality)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def seed(db, size, frame):
+    db.login_history.insert_many([
+        {"name": f"user{i}", "email": f"user{i}@gmail.com", "loginTime": datetime.utcnow()}
+        for i in range(size)
+    ])
+    db.live.insert_many([
+        {"email": f"user{i}@gmail.com", "name": f"user{i}", "status": "In Interview",
+         "isCompleted": False, "lastActive": datetime.now().isoformat(), "image": frame}
+        for i in range(size)
+    ])
+    db.results.insert_many([
+        {"question_id": f"q{i % 70 + 1}", "category": CATEGORIES[i % 5],
+         "score": float(i % 3), "session_id": f"seed-{i // 15}"}
+        for i in range(size)
+    ])
+
+
+# ------------------ Measurement ------------------
+def summarize(latencies, elapsed):
+    lat = np.array(latencies) * 1e3
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(float(np.percentile(lat, 50)), 3),
+        "p95_ms": round(float(np.percentile(lat, 95)), 3),
+        "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        "mean_ms": round(float(lat.mean()), 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+    }
+
+
+def run_stage(fn, n):
+    """Single-threaded timing of one function call."""
+    latencies = []
+    start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_endpoint(app, make_request, n, concurrency):
+    """n requests spread over `concurrency` threads, each with its own test client."""
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(n))
+
+    def worker():
+        client = app.test_client()
+        local = []
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            t0 = time.perf_counter()
+            response = make_request(client, i)
+            local.append(time.perf_counter() - t0)
+            if response.status_code >= 500:
+                raise RuntimeError(f"{response.status_code}: {response.get_data(as_text=True)[:200]}")
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(latencies, time.perf_counter() - start)
+
+
+# ------------------ Suite ------------------
+def main():
+    parser = argparse.ArgumentParser(description="Backend hot-path benchmark suite")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--dataset-size", type=int, default=1000,
+                        help="documents seeded into live/login_history/results")
+    parser.add_argument("--frame-size", default="640x480", help="WIDTHxHEIGHT of uploaded frames")
+    parser.add_argument("--frame-quality", type=int, default=80)
+    parser.add_argument("--mongo-uri", default=None, help="use a real (local) mongod instead of mongomock")
+    parser.add_argument("--out", default=None, help="JSON output path")
+    parser.add_argument("--baseline", default=None, help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    random.seed(0)
+    np.random.seed(0)
+
+    A = import_app(args.mongo_uri)
+    width, height = (int(x) for x in args.frame_size.lower().split("x"))
+    frame = make_frame(width, height, args.frame_quality)
+
+    import pandas as pd
+    answers_df = pd.read_csv(os.path.join(BASE_DIR, 'model', 'dataset_generated.csv'))
+    answers = list(zip(answers_df['question_id'].astype(str), answers_df['answer'].astype(str)))
+    random.shuffle(answers)
+
+    seed(A.db, args.dataset_size, frame)
+    app = A.app
+    n = args.requests
+    results = {"stages": {}, "endpoints": {}}
+
+    # 🔹 predict_score_dict stage by stage
+    embedder = A.COMPONENTS.get("embedder") if A.SCORING_WORKERS == 0 else None
+    classifier = A.MODEL if A.SCORING_WORKERS == 0 else None
+    cleaned = [A.clean_text(a) for _, a in answers]
+
+    stages = {
+        "clean_text": lambda i: A.clean_text(answers[i % len(answers)][1]),
+        "prefilter": lambda i: A._prefilter_answer(cleaned[i % len(cleaned)]),
+    }
+    if embedder is not None:
+        stages["encode"] = lambda i: embedder.encode([cleaned[i % len(cleaned)]])
+        X = embedder.encode(cleaned[:64])
+        stages["predict_proba"] = lambda i: classifier.predict_proba(X[i % len(X)][None, :])
+
+    def predict_cold(i):
+        A.SCORE_CACHE.clear_memory()
+        A.predict_score_dict(*reversed(answers[i % len(answers)]))
+
+    stages["predict_score_dict_cold"] = predict_cold
+    stages["predict_score_dict_warm"] = lambda i: A.predict_score_dict(*reversed(answers[i % 16]))
+
+    for name, fn in stages.items():
+        results["stages"][name] = run_stage(fn, n)
+        print(f"stage    {name:28s} {results['stages'][name]}")
+
+    # 🔹 Endpoints
+    session_id = str(uuid.uuid4())
+
+    def submit(client, i):
+        qid, answer = answers[i % len(answers)]
+        return client.post('/api/submit-answer', json={
+            "session_id": session_id, "question_id": qid, "answer": answer
+        })
+
+    def live_post(client, i):
+        return client.post('/api/live', json={
+            "email": f"user{i % args.dataset_size}@gmail.com", "name": "bench",
+            "status": "In Interview", "isCompleted": False
+        })
+
+    def upload(client, i):
+        return client.post('/api/upload-frame', json={
+            "email": f"user{i % args.dataset_size}@gmail.com", "name": "bench", "image": frame
+        })
+
+    endpoints = {
+        "GET /api/questions": lambda c, i: c.get('/api/questions'),
+        "POST /api/submit-answer": submit,
+        "GET /api/career-guidance": lambda c, i: c.get(f'/api/career-guidance?session_id=seed-{i % max(1, args.dataset_size // 15)}'),
+        "GET /api/live": lambda c, i: c.get('/api/live'),
+        "POST /api/live": live_post,
+        "POST /api/upload-frame": upload,
+    }
+    for name, make_request in endpoints.items():
+        results["endpoints"][name] = run_endpoint(app, make_request, n, args.concurrency)
+        print(f"endpoint {name:28s} {results['endpoints'][name]}")
+
+    results["config"] = {
+        "requests": n,
+        "concurrency": args.concurrency,
+        "dataset_size": args.dataset_size,
+        "frame_size": args.frame_size,
+        "frame_bytes": len(frame),
+        "mongo": args.mongo_uri or "mongomock",
+        "embedder_backend": A.EMBEDDER_BACKEND,
+        "scoring_mode": A.SCORING_MODE,
+        "scoring_workers": A.SCORING_WORKERS,
+    }
+    results["meta"] = {
+        "commit": _git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+    out = args.out or os.path.join(
+        BASE_DIR, 'benchmarks', 'results', f"{results['meta']['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print("Results written to", out)
+
+    if args.baseline:
+        compare(args.baseline, results)
+
+
+def compare(baseline_path, results):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\nvs {baseline_path} ({baseline.get('meta', {}).get('commit')})")
+    print(f"{'':40s} {'p50 before':>11s} {'p50 after':>10s} {'change':>8s}")
+    for section in ("stages", "endpoints"):
+        for name, now in results[section].items():
+            before = baseline.get(section, {}).get(name)
+            if not before:
+                continue
+            change = (now["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+            print(f"{name:40s} {before['p50_ms']:11.3f} {now['p50_ms']:10.3f} {change:+7.1f}%")
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from database.indexes import ensure_indexes, explain_route_queries, missing_indexes
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Create/verify the Mongo indexes the API needs and explain() every route query."
+    )
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI"), help="default: MONGO_URI from .env")
+    parser.add_argument("--db", default="user_database")
+    parser.add_argument("--no-create", action="store_true", help="only verify, don't create missing indexes")
+    args = parser.parse_args()
+
+    if not args.uri:
+        raise RuntimeError("MONGO_URI not set")
+
+    db = MongoClient(args.uri)[args.db]
+    if not args.no_create:
+        ensure_indexes(db)
+
+    ok = True
+    missing = missing_indexes(db)
+    for name in missing:
+        print(f"❌ missing index {name}")
+        ok = False
+
+    for route, collection, query, stages, collscan in explain_route_queries(db):
+        mark = "❌" if collscan else "✅"
+        print(f"{mark} {route:50s} {collection}.find({json.dumps(query)}) -> {' > '.join(stages)}")
+        ok = ok and not collscan
+
+    print("All route queries use an index" if ok else "Some route queries scan the whole collection")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+
+from utils.score_cache import LRUCache
+
+BLOB_STORES = ("gridfs", "filesystem")
+
+_DATA_URL = re.compile(r"^data:([\w.+-]+/[\w.+-]+)?(;[^,]*)?,", re.IGNORECASE)
+
+
+def blob_id(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def decode_data_url(value):
+    """
+    'data:image/jpeg;base64,...' (or bare base64) -> (bytes, content_type).
+    Returns (None, None) for anything that isn't a decodable image.
+    """
+    if not isinstance(value, str) or not value:
+        return None, None
+
+    content_type = "image/jpeg"
+    match = _DATA_URL.match(value)
+    if match:
+        content_type = (match.group(1) or content_type).lower()
+        value = value[match.end():]
+
+    try:
+        data = base64.b64decode(value, validate=False)
+    except (binascii.Error, ValueError):
+        return None, None
+    return (data, content_type) if data else (None, None)
+
+
+def sniff_content_type(data):
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+class FilesystemBlobStore:
+    """
+    Blobs stored under root/ab/cd/<sha256>, written to a temp file and
+    renamed into place, so identical content is only ever stored once and
+    readers never see a partial file.
+    """
+
+    kind = "filesystem"
+
+    def __init__(self, root):
+        self.root = root
+        self._known = LRUCache(max_entries=10000, ttl_seconds=None)
+
+    def _path(self, sha):
+        return os.path.join(self.root, sha[:2], sha[2:4], sha)
+
+    def exists(self, sha):
+        return self._known.get(sha) is not None or os.path.exists(self._path(sha))
+
+    def put(self, data, content_type=None):
+        sha = blob_id(data)
+        if self.exists(sha):
+            self._known.put(sha, True)
+            return sha
+
+        path = self._path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._known.put(sha, True)
+        return sha
+
+    def get(self, sha):
+        """(bytes, content_type), or (None, None) if the blob doesn't exist."""
+        try:
+            with open(self._path(sha), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None, None
+        return data, sniff_content_type(data)
+
+
+class GridFSBlobStore:
+    """
+    Blobs stored in a GridFS bucket with the sha256 as file _id, so a
+    second upload of the same content is a no-op.
+    """
+
+    kind = "gridfs"
+
+    def __init__(self, db, bucket_name="blobs"):
+        import gridfs
+        self._gridfs = gridfs
+        self.bucket = gridfs.GridFSBucket(db, bucket_name=bucket_name)
+        self.files = db[f"{bucket_name}.files"]
+        self._known = LRUCache(max_entries=10000, ttl_seconds=None)
+
+    def exists(self, sha):
+        return self._known.get(sha) is not None or self.files.find_one({"_id": sha}, {"_id": 1}) is not None
+
+    def put(self, data, content_type=None):
+        from pymongo.errors import DuplicateKeyError
+
+        sha = blob_id(data)
+        if not self.exists(sha):
+            try:
+                self.bucket.upload_from_stream_with_id(
+                    sha, sha, data,
+                    metadata={"contentType": content_type or sniff_content_type(data)}
+                )
+            except (self._gridfs.errors.FileExists, DuplicateKeyError):
+                pass    # another request stored the same frame first
+        self._known.put(sha, True)
+        return sha
+
+    def get(self, sha):
+        try:
+            stream = self.bucket.open_download_stream(sha)
+        except self._gridfs.errors.NoFile:
+            return None, None
+        data = stream.read()
+        content_type = (stream.metadata or {}).get("contentType") or sniff_content_type(data)
+        return data, content_type
+
+
+def open_blob_store(kind, db=None, root=None):
+    kind = (kind or "gridfs").lower()
+    if kind == "gridfs":
+        return GridFSBlobStore(db)
+    if kind == "filesystem":
+        return FilesystemBlobStore(root)
+    raise ValueError(f"Unknown BLOB_STORE '{kind}', expected one of {BLOB_STORES}")
+
+
+def store_frame_image(store, image):
+    """
+    Stores a data-URL frame and returns the metadata that replaces it in
+    frames/live documents, or None if the image can't be decoded.
+    """
+    data, content_type = decode_data_url(image)
+    if data is None:
+        return None
+    return {
+        "image_ref": store.put(data, content_type),
+        "image_type": content_type,
+        "image_bytes": len(data),
+    }
@@ -0,0 +1,53 @@
+import base64
+import json
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING
+
+# Newest first; _id breaks ties between frames with the same timestamp
+FRAME_SORT = [("time", DESCENDING), ("_id", DESCENDING)]
+
+# Metadata only - the image itself is fetched from /api/blobs/<image_ref>
+FRAME_METADATA = {"name": 1, "email": 1, "time": 1, "image_ref": 1, "image_type": 1, "image_bytes": 1}
+
+
+def encode_cursor(doc):
+    raw = json.dumps([doc.get("time"), str(doc["_id"])]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Opaque page cursor -> (time, ObjectId). Raises ValueError if malformed."""
+    try:
+        time, oid = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return time, ObjectId(oid)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def frames_query(email=None, since=None, until=None, cursor=None):
+    """
+    Filter for one page of frames. `since`/`until` are ISO timestamps,
+    compared against the ISO `time` strings stored by upload-frame.
+    """
+    query = {}
+    if email:
+        query["email"] = email
+
+    time_range = {}
+    if since:
+        time_range["$gte"] = since
+    if until:
+        time_range["$lt"] = until
+    if time_range:
+        query["time"] = time_range
+
+    if cursor:
+        time, oid = decode_cursor(cursor)
+        after = {"time": time, "_id": {"$lt": oid}}
+        if time is not None:
+            # Frames without a time (very old uploads) sort after every timestamp
+            after = {"$or": [{"time": {"$lt": time}}, after, {"time": None}]}
+        query = {"$and": [query, after]} if query else after
+    return query
@@ -0,0 +1,89 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+# (collection, keys, options) - every index a route relies on.
+# results.session_id is deliberately not unique: one interview session
+# stores one result per answered question.
+INDEXES = [
+    ("users", [("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    ("login_history", [("email", ASCENDING), ("loginTime", DESCENDING)], {"name": "email_loginTime"}),
+    ("results", [("session_id", ASCENDING)], {"name": "session_id"}),
+    ("live", [("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    ("live", [("status", ASCENDING)], {"name": "status"}),
+    ("frames", [("time", DESCENDING), ("_id", DESCENDING)], {"name": "time_id"}),
+    ("frames", [("email", ASCENDING), ("time", DESCENDING), ("_id", DESCENDING)], {"name": "email_time_id"}),
+]
+
+# (route, collection, filter, sort) - the filtered queries each route runs.
+# Unfiltered listings (/api/live GET, /api/all-users) read the whole
+# collection on purpose and are not checked; /api/frames pages through an
+# index even without filters.
+ROUTE_QUERIES = [
+    ("/api/career-guidance", "results", {"session_id": "explain"}, None),
+    ("/login, /google-login", "users", {"email": "explain@gmail.com"}, None),
+    ("/login, /google-login", "login_history", {"email": "explain@gmail.com"}, [("loginTime", DESCENDING)]),
+    ("/api/live POST, /api/live/<email>, /api/upload-frame, /api/admin-stop", "live", {"email": "explain@gmail.com"}, None),
+    ("/api/completed", "live", {"status": "Completed"}, None),
+    ("/api/frames", "frames", {}, [("time", DESCENDING), ("_id", DESCENDING)]),
+    ("/api/frames?email=", "frames", {"email": "explain@gmail.com"}, [("time", DESCENDING), ("_id", DESCENDING)]),
+]
+
+
+def ensure_indexes(db):
+    """
+    Creates any missing index from INDEXES (create_index is a no-op when
+    the index already exists). Returns the names of indexes that could not
+    be built, e.g. a unique index over collections that already contain
+    duplicates - those are reported instead of blocking startup.
+    """
+    failed = []
+    for collection, keys, options in INDEXES:
+        try:
+            db[collection].create_index(keys, **options)
+        except (DuplicateKeyError, OperationFailure) as e:
+            name = f"{collection}.{options['name']}"
+            print(f"⚠️ Could not create index {name}: {e}")
+            failed.append(name)
+    return failed
+
+
+def missing_indexes(db):
+    """Indexes from INDEXES whose key pattern (and uniqueness) is not on the collection."""
+    missing = []
+    for collection, keys, options in INDEXES:
+        wanted = ([tuple(k) for k in keys], bool(options.get("unique")))
+        existing = [
+            ([tuple(k) for k in info["key"]], bool(info.get("unique")))
+            for info in db[collection].index_information().values()
+        ]
+        if wanted not in existing:
+            missing.append(f"{collection}.{options['name']}")
+    return missing
+
+
+def _plan_stages(plan):
+    """Every stage name in an explain() plan tree, classic or SBE format."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def explain_route_queries(db):
+    """
+    Runs explain() on every query in ROUTE_QUERIES.
+    Returns [(route, collection, filter, stages, collscan)].
+    """
+    report = []
+    for route, collection, query, sort in ROUTE_QUERIES:
+        cursor = db[collection].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = list(_plan_stages(plan))
+        report.append((route, collection, query, stages, "COLLSCAN" in stages))
+    return report
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta, timezone
+
+from pymongo import UpdateOne
+
+from utils.score_cache import LRUCache
+
+
+class LoginRecorder:
+    """
+    Records logins in db.login_history, at most one per email per
+    `window_seconds`.
+
+    A per-email cache of the last recorded login answers repeat logins
+    without touching Mongo; otherwise one conditional upsert both checks
+    the window and inserts:
+
+        update_one({email, loginTime >= now - window}, {$setOnInsert: ...}, upsert=True)
+
+    matches (and changes nothing) when a recent login exists, and inserts
+    the new entry when it doesn't.
+    """
+
+    def __init__(self, collection_fn, window_seconds=60, cache_size=10000):
+        self._collection_fn = collection_fn
+        self.window = timedelta(seconds=window_seconds)
+        self._last_login = LRUCache(max_entries=cache_size, ttl_seconds=window_seconds)
+
+    def _pending(self, name, email, now):
+        """(entry, filter, update) for the conditional upsert, or None if the cache answers."""
+        last = self._last_login.get(email)
+        if last is not None and now - last < self.window:
+            return None
+        entry = {"name": name, "email": email, "loginTime": now}
+        return entry, {"email": email, "loginTime": {"$gte": now - self.window}}, {"$setOnInsert": entry}
+
+    def _recorded(self, entry, result):
+        if result.upserted_id is None:
+            return None
+        self._last_login.put(entry["email"], entry["loginTime"])
+        return entry
+
+    def record(self, name, email, now=None):
+        """Returns the inserted entry, or None if the login was inside the window."""
+        pending = self._pending(name, email, now or datetime.utcnow())
+        if pending is None:
+            return None
+        entry, query, update = pending
+        return self._recorded(entry, self._collection_fn().update_one(query, update, upsert=True))
+
+    async def record_async(self, collection, name, email, now=None):
+        """record() through an async driver collection (pymongo AsyncCollection)."""
+        pending = self._pending(name, email, now or datetime.utcnow())
+        if pending is None:
+            return None
+        entry, query, update = pending
+        return self._recorded(entry, await collection.update_one(query, update, upsert=True))
+
+
+# ------------------ Version (ETag for /api/all-users) ------------------
+# Entries are inserted far more often than rewritten: count + newest _id
+# change on every insert, and anything that rewrites existing entries
+# bumps a counter in VERSIONS_COLLECTION.
+VERSIONS_COLLECTION = "collection_versions"
+
+
+def bump_version(collection):
+    collection.database[VERSIONS_COLLECTION].update_one(
+        {"_id": collection.name}, {"$inc": {"version": 1}}, upsert=True
+    )
+
+
+def _version_string(count, newest, marker):
+    return f"{count}-{newest['_id'] if newest else ''}-{(marker or {}).get('version', 0)}"
+
+
+def login_history_version(collection):
+    """Cheap identifier of the collection's contents - no scan."""
+    return _version_string(
+        collection.estimated_document_count(),
+        collection.find_one({}, {"_id": 1}, sort=[("_id", -1)]),
+        collection.database[VERSIONS_COLLECTION].find_one({"_id": collection.name}),
+    )
+
+
+async def login_history_version_async(collection):
+    """login_history_version() through an async driver collection."""
+    return _version_string(
+        await collection.estimated_document_count(),
+        await collection.find_one({}, {"_id": 1}, sort=[("_id", -1)]),
+        await collection.database[VERSIONS_COLLECTION].find_one({"_id": collection.name}),
+    )
+
+
+def parse_login_time(value):
+    """Legacy string loginTime -> naive UTC datetime, or None if unparseable."""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def normalize_login_times(collection, batch_size=1000):
+    """
+    Converts every string loginTime to a BSON datetime in batched
+    bulk_writes. Returns (converted, unparseable_ids).
+    """
+    converted = 0
+    unparseable = []
+    ops = []
+
+    for doc in collection.find({"loginTime": {"$type": "string"}}, {"loginTime": 1}).batch_size(batch_size):
+        parsed = parse_login_time(doc["loginTime"])
+        if parsed is None:
+            unparseable.append(doc["_id"])
+            continue
+        ops.append(UpdateOne({"_id": doc["_id"], "loginTime": doc["loginTime"]}, {"$set": {"loginTime": parsed}}))
+        if len(ops) >= batch_size:
+            collection.bulk_write(ops, ordered=False)
+            converted += len(ops)
+            ops = []
+
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+        converted += len(ops)
+    if converted:
+        bump_version(collection)    # cached /api/all-users responses are stale now
+    return converted, unparseable
@@ -0,0 +1,171 @@
+from datetime import datetime
+
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+# One document per interview session:
+#   {_id: session_id, totals: {category: sum of scores}, counts: {category: answers}, answered,
+#    ids: [result _ids counted], version, updatedAt}
+# kept up to date with $inc as results are stored, so career guidance is one keyed read.
+# `ids` stops a result from being counted by both a rebuild and its own $inc;
+# `version` stops a rebuild from overwriting an $inc that landed while it ran.
+COLLECTION = "session_totals"
+REBUILD_RETRIES = 5
+
+
+def _group_pipeline(match):
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {"session_id": "$session_id", "category": "$category"},
+            "total": {"$sum": "$score"},
+            "count": {"$sum": 1},
+            "ids": {"$push": "$_id"},
+        }},
+    ]
+
+
+def _totals_doc(session_id, groups, version=1):
+    """Aggregate document from [(category, total, count, ids)]."""
+    doc = {
+        "_id": session_id, "totals": {}, "counts": {}, "answered": 0, "ids": [],
+        "version": version, "updatedAt": datetime.utcnow(),
+    }
+    for category, total, count, ids in groups:
+        doc["ids"].extend(ids)
+        if category is None:
+            continue
+        doc["totals"][category] = total
+        doc["counts"][category] = count
+        doc["answered"] += count
+    return doc
+
+
+def record_scores(db, session_id, records):
+    """
+    $inc the session's totals with freshly inserted result records
+    (called after the records are written).
+    The $inc only applies if none of the records were counted yet - if a
+    rebuild already picked some of them up, the session is rebuilt again
+    instead. If this call created the aggregate but the session already had
+    older results (a session that started before totals existed), it is
+    rebuilt from db.results as well.
+    """
+    ids = [r["_id"] for r in records]
+    inc = {"answered": 0, "version": 1}
+    for r in records:
+        inc[f"totals.{r['category']}"] = inc.get(f"totals.{r['category']}", 0) + r["score"]
+        inc[f"counts.{r['category']}"] = inc.get(f"counts.{r['category']}", 0) + 1
+        inc["answered"] += 1
+
+    try:
+        update = db[COLLECTION].update_one(
+            {"_id": session_id, "ids": {"$nin": ids}},
+            {"$inc": inc, "$push": {"ids": {"$each": ids}}, "$set": {"updatedAt": datetime.utcnow()}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The aggregate exists and already counts some of these records
+        return rebuild_session(db, session_id)
+    if update.upserted_id is None:
+        return None
+
+    if db.results.count_documents({"session_id": session_id, "_id": {"$nin": ids}}, limit=1):
+        return rebuild_session(db, session_id)
+    return None
+
+
+def rebuild_session(db, session_id):
+    """
+    Recomputes one session's aggregate server-side with $match/$group and
+    stores it - only if no $inc changed the stored version meanwhile,
+    otherwise it recomputes.
+    """
+    for _ in range(REBUILD_RETRIES):
+        current = db[COLLECTION].find_one({"_id": session_id}, {"version": 1})
+        groups = [
+            (g["_id"]["category"], g["total"], g["count"], g["ids"])
+            for g in db.results.aggregate(_group_pipeline({"session_id": session_id}))
+        ]
+        if not groups:
+            return None
+
+        try:
+            if current is None:
+                doc = _totals_doc(session_id, groups)
+                db[COLLECTION].insert_one(doc)
+                return doc
+            version = current.get("version")
+            doc = _totals_doc(session_id, groups, version=(version or 0) + 1)
+            if db[COLLECTION].replace_one({"_id": session_id, "version": version}, doc).matched_count:
+                return doc
+        except DuplicateKeyError:
+            pass
+
+    print(f"Session totals for {session_id} kept changing, rebuild skipped")
+    return None
+
+
+def record_scores_safely(db, session_id, records):
+    """
+    record_scores() for a write-behind callback. If it fails the aggregate
+    is dropped, so the next read rebuilds it rather than serving a total
+    that is missing these records.
+    """
+    try:
+        return record_scores(db, session_id, records)
+    except Exception as e:
+        print(f"Session totals for {session_id} not updated, marking for rebuild:", e)
+        try:
+            db[COLLECTION].delete_one({"_id": session_id})
+        except Exception as e:
+            print(f"Could not drop session totals for {session_id}:", e)
+
+
+def get_session_totals(db, session_id):
+    """
+    The stored aggregate, rebuilt when it is missing (sessions that predate
+    it, or a failed update) or doesn't count every stored result.
+    """
+    doc = db[COLLECTION].find_one({"_id": session_id})
+    if doc is not None and "ids" in doc:
+        # Keyed count on the session_id index - catches an update lost while Mongo was unreachable
+        if db.results.count_documents({"session_id": session_id}) != len(doc["ids"]):
+            doc = None
+    if doc is None:
+        doc = rebuild_session(db, session_id)
+    return doc
+
+
+def backfill(db, batch_size=1000):
+    """
+    Rebuilds every session's aggregate from db.results in one $group pass,
+    sorted by session so each session is written as soon as its groups are
+    complete, in batched bulk_write upserts. Returns the number of sessions.
+    """
+    pipeline = _group_pipeline({"session_id": {"$exists": True}}) + [{"$sort": {"_id.session_id": 1}}]
+
+    ops = []
+    written = 0
+    current, groups = None, []
+
+    def flush_session():
+        if groups:
+            ops.append(ReplaceOne({"_id": current}, _totals_doc(current, groups), upsert=True))
+
+    for g in db.results.aggregate(pipeline, allowDiskUse=True):
+        session_id = g["_id"]["session_id"]
+        if session_id != current:
+            flush_session()
+            current, groups = session_id, []
+            if len(ops) >= batch_size:
+                db[COLLECTION].bulk_write(ops, ordered=False)
+                written += len(ops)
+                ops = []
+        groups.append((g["_id"].get("category"), g["total"], g["count"], g["ids"]))
+    flush_session()
+
+    if ops:
+        db[COLLECTION].bulk_write(ops, ordered=False)
+        written += len(ops)
+    return written
@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.embedders import (
+    ONNX_CONFIG_FILE, ONNX_INT8_MODEL_FILE, ONNX_MODEL_FILE, load_embedder
+)
+from utils.preprocessing import clean_text
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EMBEDDER_NAME = 'all-MiniLM-L6-v2'
+ONNX_DIR = os.path.join(BASE_DIR, 'model', 'onnx')
+MODEL_PATH = os.path.join(BASE_DIR, 'model', 'interview_semantic_clf.joblib')
+DATASET_PATH = os.path.join(BASE_DIR, 'model', 'dataset_generated.csv')
+
+
+def export(onnx_dir):
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    print(f"Loading SentenceTransformer '{EMBEDDER_NAME}'...")
+    st_model = SentenceTransformer(EMBEDDER_NAME, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    os.makedirs(onnx_dir, exist_ok=True)
+    tokenizer.save_pretrained(onnx_dir)
+
+    config = {
+        "source": EMBEDDER_NAME,
+        "max_seq_length": st_model.max_seq_length,
+        "dim": st_model.get_sentence_embedding_dimension(),
+        "normalize": any(type(m).__name__ == "Normalize" for m in st_model),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(os.path.join(onnx_dir, ONNX_CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    class TokenEmbeddings(torch.nn.Module):
+        # Only last_hidden_state - pooling is done in OnnxEmbedder
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids,
+            )[0]
+
+    dummy = tokenizer(["export the embedder"], return_tensors="pt")
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    fp32_path = os.path.join(onnx_dir, ONNX_MODEL_FILE)
+
+    print("Exporting ONNX model to:", fp32_path)
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer),
+            tuple(dummy[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+
+    int8_path = os.path.join(onnx_dir, ONNX_INT8_MODEL_FILE)
+    print("Quantizing (dynamic int8) to:", int8_path)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+
+def parity_check(onnx_dir):
+    """
+    Compares the ONNX backends with PyTorch on dataset_generated.csv:
+    worst-case cosine deviation of the embeddings and how often the
+    classifier predicts the same class.
+    """
+    df = pd.read_csv(DATASET_PATH).dropna(subset=['answer'])
+    texts = [clean_text(a) for a in df['answer'].astype(str)]
+    clf = joblib.load(MODEL_PATH)
+
+    reference = load_embedder("torch", EMBEDDER_NAME, onnx_dir).encode(texts)
+    ref_pred = clf.predict(reference)
+    ref_unit = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+
+    print(f"Parity on {len(texts)} answers from {os.path.basename(DATASET_PATH)}")
+    for backend in ("onnx", "onnx-int8"):
+        X = load_embedder(backend, EMBEDDER_NAME, onnx_dir).encode(texts)
+        unit = X / np.linalg.norm(X, axis=1, keepdims=True)
+        cosine = (unit * ref_unit).sum(axis=1)
+        agreement = float((clf.predict(X) == ref_pred).mean())
+        print(f"  {backend:10s} max cosine deviation: {float((1 - cosine).max()):.6f}"
+              f"  mean: {float((1 - cosine).mean()):.6f}"
+              f"  MODEL.predict agreement: {agreement * 100:.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the MiniLM embedder to ONNX and check parity.")
+    parser.add_argument("--out", default=ONNX_DIR, help="output folder (default: model/onnx)")
+    parser.add_argument("--check-only", action="store_true", help="skip the export, only run the parity check")
+    args = parser.parse_args()
+
+    if not args.check_only:
+        export(args.out)
+    parity_check(args.out)
+    print("DONE. Set EMBEDDER_BACKEND=onnx or onnx-int8 to use it in app.py.")
+
+
+if __name__ == "__main__":
+    main()
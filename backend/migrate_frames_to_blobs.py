@@ -0,0 +1,83 @@
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+from database.blob_store import open_blob_store, store_frame_image
+
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def migrate(collection, store, batch_size):
+    """
+    Moves base64 `image` fields into the blob store, batch_size documents
+    at a time in _id order. Only documents that still hold a string image
+    are read, so an interrupted run can simply be started again.
+    """
+    query = {"image": {"$type": "string"}}
+    moved = skipped = saved_bytes = 0
+    last_id = None
+
+    while True:
+        page_query = dict(query, _id={"$gt": last_id}) if last_id is not None else query
+        docs = list(
+            collection.find(page_query, {"image": 1}).sort("_id", 1).limit(batch_size)
+        )
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        ops = []
+        for doc in docs:
+            image = store_frame_image(store, doc["image"])
+            if image is None:
+                skipped += 1
+                continue
+            ops.append(UpdateOne(
+                {"_id": doc["_id"], "image": doc["image"]},     # skip if it changed meanwhile
+                {"$set": image, "$unset": {"image": ""}}
+            ))
+            saved_bytes += len(doc["image"])
+
+        if ops:
+            collection.bulk_write(ops, ordered=False)
+            moved += len(ops)
+        print(f"  {collection.name}: {moved} moved, {skipped} skipped")
+
+    return moved, skipped, saved_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move base64 frames out of frames/live documents into the blob store.")
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI"), help="default: MONGO_URI from .env")
+    parser.add_argument("--db", default="user_database")
+    parser.add_argument("--store", default=os.getenv("BLOB_STORE", "gridfs"), help="gridfs | filesystem")
+    parser.add_argument("--blob-dir", default=os.getenv("BLOB_DIR", os.path.join(BASE_DIR, 'blobs')))
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="only count the documents that would be migrated")
+    args = parser.parse_args()
+
+    if not args.uri:
+        raise RuntimeError("MONGO_URI not set")
+
+    db = MongoClient(args.uri)[args.db]
+    store = open_blob_store(args.store, db=db, root=args.blob_dir)
+
+    if args.dry_run:
+        for name in ("frames", "live"):
+            print(f"{name}: {db[name].count_documents({'image': {'$type': 'string'}})} documents with inline images")
+        return
+
+    for name in ("frames", "live"):
+        start = time.perf_counter()
+        moved, skipped, saved_bytes = migrate(db[name], store, args.batch_size)
+        print(f"✅ {name}: moved {moved} images ({saved_bytes / 1e6:.1f} MB of base64), "
+              f"skipped {skipped}, {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from database.login_history import normalize_login_times
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="One-time job: convert legacy string loginTime values in login_history to BSON datetimes."
+    )
+    parser.add_argument("--uri", default=os.getenv("MONGO_URI"), help="default: MONGO_URI from .env")
+    parser.add_argument("--db", default="user_database")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if not args.uri:
+        raise RuntimeError("MONGO_URI not set")
+
+    db = MongoClient(args.uri)[args.db]
+    start = time.perf_counter()
+    converted, unparseable = normalize_login_times(db.login_history, batch_size=args.batch_size)
+    print(f"✅ Converted {converted} loginTime values in {time.perf_counter() - start:.1f}s")
+    if unparseable:
+        print(f"⚠️ {len(unparseable)} values could not be parsed, left unchanged: {unparseable[:20]}")
+
+
+if __name__ == "__main__":
+    main()
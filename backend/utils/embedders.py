@@ -0,0 +1,154 @@
+import json
+import os
+
+import numpy as np
+
+EMBEDDER_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+ONNX_CONFIG_FILE = "embedder_config.json"
+
+
+class TorchEmbedder:
+    """The original PyTorch SentenceTransformer."""
+
+    backend = "torch"
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, batch_size=64):
+        return np.asarray(self.model.encode(list(texts), batch_size=batch_size), dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+
+class OnnxEmbedder:
+    """
+    Runs the MiniLM transformer exported by export_onnx_embedder.py through
+    onnxruntime, then applies the same mean pooling (+ L2 normalisation)
+    as the SentenceTransformer pipeline.
+    """
+
+    def __init__(self, model_dir, quantized=False, num_threads=0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE), encoding="utf-8") as f:
+            self.config = json.load(f)
+
+        self.backend = "onnx-int8" if quantized else "onnx"
+        self.model_path = os.path.join(model_dir, ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = int(num_threads)
+        self.session = ort.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=int(self.config["max_seq_length"]))
+        self.tokenizer.enable_padding(
+            pad_id=int(self.config.get("pad_token_id", 0)),
+            pad_token=self.config.get("pad_token", "[PAD]"),
+        )
+
+    def encode(self, texts, batch_size=64):
+        texts = list(texts)
+        out = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            out[start:start + batch_size] = self._encode_batch(texts[start:start + batch_size])
+        return out
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real (non-padding) tokens
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        embeddings = summed / counts
+
+        if self.config.get("normalize", True):
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings.astype(np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return int(self.config["dim"])
+
+
+TORCH_MODEL_FILES = ("config.json", "model.safetensors", "pytorch_model.bin", "modules.json")
+BACKEND_PACKAGES = {
+    "torch": ("sentence-transformers", "transformers", "torch"),
+    "onnx": ("onnxruntime", "tokenizers"),
+    "onnx-int8": ("onnxruntime", "tokenizers"),
+}
+
+
+def _torch_model_files(model_name):
+    # Local model folder, or the files sentence-transformers downloaded into the HF cache
+    if os.path.isdir(model_name):
+        return [os.path.join(model_name, name) for name in TORCH_MODEL_FILES]
+    try:
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return []
+    repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    files = []
+    for name in TORCH_MODEL_FILES:
+        path = try_to_load_from_cache(repo_id, name)
+        if isinstance(path, str):
+            files.append(path)
+    return files
+
+
+def backend_model_files(backend, onnx_dir, model_name=None):
+    """Files an embedder backend reads - used to fingerprint cached embeddings."""
+    if backend == "onnx":
+        return [os.path.join(onnx_dir, ONNX_MODEL_FILE)]
+    if backend == "onnx-int8":
+        return [os.path.join(onnx_dir, ONNX_INT8_MODEL_FILE)]
+    if model_name:
+        return _torch_model_files(model_name)
+    return []
+
+
+def backend_versions(backend):
+    """Installed versions of the packages an embedder backend runs on, e.g. ["torch==2.5.1", ...]."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = []
+    for package in BACKEND_PACKAGES.get(backend, ()):
+        try:
+            versions.append(f"{package}=={version(package)}")
+        except PackageNotFoundError:
+            versions.append(f"{package}==missing")
+    return versions
+
+
+def load_embedder(backend, model_name, onnx_dir, num_threads=0):
+    """
+    backend: "torch" (PyTorch SentenceTransformer), "onnx" (exported fp32
+    model) or "onnx-int8" (dynamically quantized model).
+    """
+    backend = (backend or "torch").lower()
+    if backend == "torch":
+        return TorchEmbedder(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEmbedder(onnx_dir, quantized=(backend == "onnx-int8"), num_threads=num_threads)
+    raise ValueError(f"Unknown EMBEDDER_BACKEND '{backend}', expected one of {EMBEDDER_BACKENDS}")
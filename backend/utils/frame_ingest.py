@@ -0,0 +1,154 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from database.blob_store import decode_data_url
+from utils.score_cache import LRUCache
+
+
+def dhash(img, hash_size=8):
+    """64-bit difference hash: brighter/darker between horizontal neighbours."""
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def prepare_frame(data, max_size=(640, 480), quality=70):
+    """
+    Decoded, downscaled (never upscaled) and re-encoded JPEG frame:
+    (jpeg bytes, dhash, (width, height)). Raises OSError/ValueError for
+    data PIL can't read.
+    """
+    img = Image.open(io.BytesIO(data))
+    img.draft("RGB", max_size)      # JPEG: decode at a reduced scale straight away
+    img = img.convert("RGB")
+    img.thumbnail(max_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue(), dhash(img), img.size
+
+
+class FrameIngestor:
+    """
+    Processes uploaded webcam frames off the request thread.
+
+    Each frame is decoded, downscaled to `max_size`, re-encoded as JPEG at
+    `quality` and hashed (dHash). A frame within `max_distance` bits of the
+    candidate's previous stored frame is dropped; otherwise it goes to the
+    blob store. Either way `on_frame(email, name, image)` is called, with
+    image=None for a dropped frame.
+
+    The previous hash comes from an in-memory cache, falling back to
+    `previous_hash_fn(email)` (the hex hash on the live document) after a
+    restart. When `max_pending` frames are already waiting, submit()
+    processes the frame in the calling thread instead.
+    """
+
+    def __init__(self, store, on_frame, previous_hash_fn=None, max_size=(640, 480), quality=70,
+                 max_distance=4, workers=1, max_pending=1000):
+        self.store = store
+        self.on_frame = on_frame
+        self.previous_hash_fn = previous_hash_fn
+        self.max_size = tuple(max_size)
+        self.quality = quality
+        self.max_distance = max_distance
+
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="frame-ingest")
+        self._slots = threading.BoundedSemaphore(max(1, int(max_pending)))
+        self._last_hash = LRUCache(max_entries=10000, ttl_seconds=None)
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.stored = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.sync_fallbacks = 0
+        self.bytes_in = 0
+        self.bytes_stored = 0
+
+    def submit(self, email, name, image):
+        """
+        Queues a frame - raw image bytes or a data URL. Returns the Future,
+        or None if it ran inline.
+        """
+        with self._lock:
+            self.submitted += 1
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.sync_fallbacks += 1
+            self._process(email, name, image)
+            return None
+
+        future = self._pool.submit(self._process, email, name, image)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _previous_hash(self, email):
+        value = self._last_hash.get(email)
+        if value is None and self.previous_hash_fn is not None:
+            stored = self.previous_hash_fn(email)
+            value = int(stored, 16) if stored else None
+        return value
+
+    def _process(self, email, name, image):
+        try:
+            data = image if isinstance(image, bytes) else decode_data_url(image)[0]
+            if not data:
+                raise ValueError("empty or not base64")
+            jpeg, frame_hash, _ = prepare_frame(data, self.max_size, self.quality)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            with self._lock:
+                self.invalid += 1
+            print(f"Frame from {email} dropped, can't decode:", e)
+            return
+
+        try:
+            previous = self._previous_hash(email)
+            if previous is not None and hamming(previous, frame_hash) <= self.max_distance:
+                with self._lock:
+                    self.duplicates += 1
+                    self.bytes_in += len(data)
+                self.on_frame(email, name, None)
+                return
+
+            stored = {
+                "image_ref": self.store.put(jpeg, "image/jpeg"),
+                "image_type": "image/jpeg",
+                "image_bytes": len(jpeg),
+                "image_hash": f"{frame_hash:016x}",
+            }
+            self._last_hash.put(email, frame_hash)
+            with self._lock:
+                self.stored += 1
+                self.bytes_in += len(data)
+                self.bytes_stored += len(jpeg)
+            self.on_frame(email, name, stored)
+        except Exception as e:
+            print(f"Frame ingest failed for {email}:", e)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "stored": self.stored,
+                "duplicates": self.duplicates,
+                "invalid": self.invalid,
+                "sync_fallbacks": self.sync_fallbacks,
+                "bytes_in": self.bytes_in,
+                "bytes_stored": self.bytes_stored,
+            }
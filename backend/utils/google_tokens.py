@@ -0,0 +1,146 @@
+import json
+import os
+import re
+import threading
+import time
+
+from google.auth import jwt
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenVerifier:
+    """
+    Verifies Google ID tokens against cached signing certificates.
+
+    The certificates ({key id: x509 PEM}) are fetched through one pooled
+    requests.Session and kept until their Cache-Control max-age (minus Age)
+    runs out, so a login normally needs no network call. A token signed
+    with an unknown key id triggers an early refresh (key rotation), at
+    most once per `min_refresh_interval` seconds, so made-up key ids can't
+    make every login fetch. Only one thread fetches at a time, outside the
+    cache lock - other logins keep verifying against the cached certs. If
+    a refresh fails the previous certificates are used until it succeeds.
+
+    cert_file: a local JSON file in the same {kid: PEM} format, used
+    instead of the network - for offline tests with locally minted tokens.
+    """
+
+    def __init__(self, client_id, certs_url=GOOGLE_CERTS_URL, cert_file=None,
+                 clock_skew_seconds=10, default_max_age=3600, timeout=5, min_refresh_interval=60):
+        self.client_id = client_id
+        self.certs_url = certs_url
+        self.cert_file = cert_file
+        self.clock_skew_seconds = clock_skew_seconds
+        self.default_max_age = default_max_age
+        self.timeout = timeout
+        self.min_refresh_interval = min_refresh_interval
+
+        self._certs = None
+        self._expires_at = 0.0
+        self._last_forced = float("-inf")
+        self._file_mtime = None
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._session = None
+
+        self.fetches = 0
+        self.cache_hits = 0
+        self.refreshes_skipped = 0
+
+    # ------------------ Certificates ------------------
+    def _http(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _load_file(self):
+        mtime = os.path.getmtime(self.cert_file)
+        if self._certs is None or mtime != self._file_mtime:
+            with open(self.cert_file, encoding="utf-8") as f:
+                self._certs = json.load(f)
+            self._file_mtime = mtime
+        return self._certs
+
+    def _fetch(self):
+        response = self._http().get(self.certs_url, timeout=self.timeout)
+        response.raise_for_status()
+
+        max_age = self.default_max_age
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        if match:
+            max_age = int(match.group(1)) - int(response.headers.get("Age", "0") or 0)
+
+        return response.json(), time.monotonic() + max(0, max_age)
+
+    def certs(self, force_refresh=False):
+        if self.cert_file:
+            with self._lock:
+                return self._load_file()
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._certs
+            if cached is not None:
+                if force_refresh:
+                    if now - self._last_forced < self.min_refresh_interval:
+                        self.refreshes_skipped += 1
+                        return cached
+                    self._last_forced = now
+                elif now < self._expires_at:
+                    self.cache_hits += 1
+                    return cached
+
+        # One fetch at a time; with certs cached the others don't wait for it
+        if not self._fetch_lock.acquire(blocking=cached is None):
+            return cached
+        try:
+            if cached is None and self._certs is not None:
+                return self._certs     # fetched while we waited
+            try:
+                certs, expires_at = self._fetch()
+            except Exception as e:
+                if self._certs is None:
+                    raise
+                print("Google certs refresh failed, using cached certs:", e)
+                return self._certs
+            with self._lock:
+                self._certs, self._expires_at = certs, expires_at
+                self.fetches += 1
+            return certs
+        finally:
+            self._fetch_lock.release()
+
+    # ------------------ Verification ------------------
+    def verify(self, token):
+        """Decoded claims of a valid ID token for this client; raises ValueError otherwise."""
+        if isinstance(token, bytes):
+            token = token.decode("utf-8")
+        if not token:
+            raise ValueError("Missing token")
+
+        certs = self.certs()
+        kid = jwt.decode_header(token).get("kid")
+        if kid is not None and kid not in certs and not self.cert_file:
+            certs = self.certs(force_refresh=True)
+
+        claims = jwt.decode(
+            token, certs=certs, audience=self.client_id,
+            clock_skew_in_seconds=self.clock_skew_seconds
+        )
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {claims.get('iss')}")
+        return claims
+
+    def stats(self):
+        return {
+            "source": self.cert_file or self.certs_url,
+            "fetches": self.fetches,
+            "cache_hits": self.cache_hits,
+            "refreshes_skipped": self.refreshes_skipped,
+            "expires_in": round(max(0.0, self._expires_at - time.monotonic()), 1) if not self.cert_file else None,
+        }
@@ -0,0 +1,216 @@
+import asyncio
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+
+def format_sse(event_id, event, data):
+    """One Server-Sent Events message."""
+    payload = json.dumps(data, default=str)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    def __init__(self, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, message):
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+
+    def get(self, timeout):
+        """(event_id, event, data), or None after `timeout` seconds without events."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription:
+    """
+    A Subscription read from an asyncio event loop: publish() may run on
+    any thread, the waiting coroutine is woken through the loop.
+    """
+
+    def __init__(self, queue_size, loop):
+        self.queue_size = queue_size
+        self.overflowed = False
+        self._loop = loop
+        self._messages = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, message):
+        if len(self._messages) >= self.queue_size:
+            return False
+        self._messages.append(message)
+        self._loop.call_soon_threadsafe(self._ready.set)
+        return True
+
+    async def get(self, timeout):
+        while not self._messages:
+            self._ready.clear()
+            if self._messages:
+                break
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._messages.popleft()
+
+    def drain(self):
+        self._messages.clear()
+
+
+class EventBroker:
+    """
+    In-process pub/sub for the admin dashboard's event stream.
+
+    Every published event gets an increasing id and is kept in a short
+    history, so a client that reconnects with Last-Event-ID only replays
+    what it missed. A subscriber that falls `queue_size` events behind is
+    marked overflowed and should resync from a fresh snapshot.
+
+    `topic_of(event, data)` gives an event's topic (e.g. the candidate's
+    email); subscribe(topic=...) then only receives that topic's events,
+    so a publish wakes the few subscribers it concerns instead of all.
+    """
+
+    def __init__(self, history=1000, queue_size=1000, topic_of=None):
+        self.queue_size = queue_size
+        self._topic_of = topic_of
+        self._ids = itertools.count(1)
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._topics = {}       # topic -> set of subscriptions
+        self._lock = threading.Lock()
+        self.published = 0
+        self.last_id = 0
+
+    def _topic(self, event, data):
+        return self._topic_of(event, data) if self._topic_of else None
+
+    def publish(self, event, data):
+        topic = self._topic(event, data)
+        with self._lock:
+            message = (next(self._ids), event, data)
+            self.last_id = message[0]
+            self._history.append(message)
+            self.published += 1
+            subscribers = list(self._subscribers)
+            if topic is not None and topic in self._topics:
+                subscribers.extend(self._topics[topic])
+
+        for sub in subscribers:
+            if not sub.offer(message):
+                sub.overflowed = True
+        return message[0]
+
+    def subscribe(self, last_event_id=None, loop=None, topic=None):
+        """
+        Returns (subscription, missed, current_id). `missed` holds the
+        events after last_event_id, or is None when they are no longer in
+        the history (or no id was given) and the client needs a snapshot
+        as of current_id. Pass the running `loop` for an AsyncSubscription,
+        and a `topic` to receive only that topic's events.
+        """
+        sub = Subscription(self.queue_size) if loop is None else AsyncSubscription(self.queue_size, loop)
+        sub.topic = topic
+        with self._lock:
+            if topic is None:
+                self._subscribers.add(sub)
+            else:
+                self._topics.setdefault(topic, set()).add(sub)
+            missed = None
+            if last_event_id is not None and self._history:
+                oldest = self._history[0][0]
+                if last_event_id >= oldest - 1:
+                    missed = [m for m in self._history
+                              if m[0] > last_event_id and (topic is None or self._topic(m[1], m[2]) == topic)]
+            return sub, missed, self.last_id
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            topic = getattr(sub, "topic", None)
+            if topic is None:
+                self._subscribers.discard(sub)
+                return
+            subs = self._topics.get(topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._topics[topic]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "topic_subscribers": sum(len(subs) for subs in self._topics.values()),
+                "published": self.published,
+            }
+
+
+class ChangeStreamFeed:
+    """
+    Publishes Mongo change stream events into an EventBroker, so every
+    app process sees writes made by the others. `handlers` maps a
+    collection name to change -> (event, data) or None.
+
+    Change streams need a replica set (Atlas always has one); on a
+    standalone server start() returns False and the app publishes its own
+    writes instead.
+    """
+
+    def __init__(self, db, broker, handlers, retry_seconds=5):
+        self.db = db
+        self.broker = broker
+        self.handlers = handlers
+        self.retry_seconds = retry_seconds
+        self.active = False
+        self._resume_token = None
+        self._thread = None
+
+    def start(self):
+        try:
+            # Opening the stream fails right away if change streams are not supported
+            stream = self._open()
+        except Exception as e:
+            print("Change streams unavailable, publishing local writes only:", e)
+            return False
+
+        self.active = True
+        self._thread = threading.Thread(target=self._run, args=(stream,), name="change-stream-feed", daemon=True)
+        self._thread.start()
+        return True
+
+    def _open(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self.handlers)}}}]
+        return self.db.watch(
+            pipeline, full_document="updateLookup", resume_after=self._resume_token
+        )
+
+    def _run(self, stream):
+        while True:
+            try:
+                with stream:
+                    for change in stream:
+                        self._resume_token = change.get("_id")
+                        handler = self.handlers.get(change.get("ns", {}).get("coll"))
+                        result = handler(change) if handler else None
+                        if result:
+                            self.broker.publish(*result)
+            except Exception as e:
+                print("Change stream error, reconnecting:", e)
+
+            time.sleep(self.retry_seconds)
+            try:
+                stream = self._open()
+            except Exception as e:
+                print("Change stream reopen failed:", e)
+                self._resume_token = None
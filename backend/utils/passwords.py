@@ -0,0 +1,84 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Every hashing slot is taken - the caller should answer 503."""
+
+
+class PasswordHasher:
+    """
+    Runs werkzeug password hashing on a small thread pool.
+
+    scrypt and pbkdf2 run inside OpenSSL with the GIL released, so the
+    pool gives real parallelism while capping how many hashes run at once
+    (`workers`) and how many may wait (`max_pending`). A hash that can't
+    get a queue slot within `queue_timeout` seconds raises HasherBusy, so
+    a login storm is turned away instead of queueing without limit or
+    oversubscribing the CPU. The *_async methods never block the event
+    loop: they wait on the pool's future and fail at once when it is full.
+
+    `method` is a werkzeug method string, e.g. "scrypt", "scrypt:16384:8:1"
+    or "pbkdf2:sha256:600000". Hashes made with other parameters are
+    reported by needs_rehash() so login can upgrade them.
+    """
+
+    def __init__(self, method="scrypt", workers=None, max_pending=256, salt_length=16, queue_timeout=2.0):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.salt_length = salt_length
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, int(max_pending)))
+
+        # Full method string as werkzeug writes it ("scrypt" -> "scrypt:32768:8:1")
+        self.method = generate_password_hash("", method=method, salt_length=salt_length).split("$", 1)[0]
+
+    def _submit(self, fn, *args, timeout=None):
+        """Future for fn(*args) on the pool; raises HasherBusy if no slot frees up in time."""
+        if timeout == 0:
+            acquired = self._slots.acquire(blocking=False)
+        else:
+            acquired = self._slots.acquire(timeout=self.queue_timeout if timeout is None else timeout)
+        if not acquired:
+            raise HasherBusy("password hashing queue is full")
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def hash(self, password):
+        return self._submit(generate_password_hash, password, self.method, self.salt_length).result()
+
+    def verify(self, stored_hash, password):
+        if not stored_hash or password is None:
+            return False
+        return self._submit(check_password_hash, stored_hash, password).result()
+
+    async def hash_async(self, password):
+        return await asyncio.wrap_future(
+            self._submit(generate_password_hash, password, self.method, self.salt_length, timeout=0)
+        )
+
+    async def verify_async(self, stored_hash, password):
+        if not stored_hash or password is None:
+            return False
+        return await asyncio.wrap_future(self._submit(check_password_hash, stored_hash, password, timeout=0))
+
+    def needs_rehash(self, stored_hash):
+        return bool(stored_hash) and stored_hash.split("$", 1)[0] != self.method
+
+    def rehash_later(self, password, save_fn):
+        """Hashes with the current parameters in the background and calls save_fn(new_hash)."""
+        def work():
+            try:
+                save_fn(generate_password_hash(password, self.method, self.salt_length))
+            except Exception as e:
+                print("Password rehash failed:", e)
+
+        if self._slots.acquire(blocking=False):
+            # Only when there is spare capacity - the next login will try again otherwise
+            future = self._pool.submit(work)
+            future.add_done_callback(lambda _: self._slots.release())
@@ -1,16 +1,47 @@
 import re
-from nltk.corpus import stopwords
 
-STOPWORDS = set(stopwords.words("english"))
+# NLTK English stopwords, bundled so importing this module doesn't need the
+# NLTK corpus. Only the entries that can survive the character filter below
+# are kept - contractions like "don't" lose their apostrophe ("dont") and
+# could never match, so dropping them doesn't change the output.
+STOPWORDS = frozenset("""
+a about above after again against ain all am an and any are aren as at be
+because been before being below between both but by can couldn d did didn do
+does doesn doing don down during each few for from further had hadn has hasn
+have haven having he her here hers herself him himself his how i if in into is
+isn it its itself just ll m ma me mightn more most mustn my myself needn no nor
+not now o of off on once only or other our ours ourselves out over own re s
+same shan she should shouldn so some such t than that the their theirs them
+themselves then there these they this those through to too under until up ve
+very was wasn we were weren what when where which while who whom why will with
+won wouldn y you your yours yourself yourselves
+""".split())
+
+# URLs and every character other than a-z, 0-9 and whitespace, removed in one pass.
+# Whitespace runs are collapsed by str.split().
+_STRIP_PATTERN = re.compile(r"http\S+|[^a-z0-9\s]+")
+
 
 def clean_text(text):
     if not isinstance(text, str):
         return ""
 
-    text = text.lower()
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"[^a-z0-9\s]", "", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _STRIP_PATTERN.sub("", text.lower())
+    return " ".join([w for w in text.split() if w not in STOPWORDS])
+
 
-    tokens = [w for w in text.split() if w not in STOPWORDS]
-    return " ".join(tokens)
+def clean_texts(texts):
+    """
+    Batch version of clean_text - returns a list with one cleaned string per
+    input, identical to calling clean_text on each.
+    """
+    strip = _STRIP_PATTERN.sub
+    stopwords = STOPWORDS
+    out = []
+    append = out.append
+    for text in texts:
+        if not isinstance(text, str):
+            append("")
+            continue
+        append(" ".join([w for w in strip("", text.lower()).split() if w not in stopwords]))
+    return out
@@ -0,0 +1,190 @@
+import copy
+import threading
+
+
+class PresenceTable:
+    """
+    Current db.live state held in memory, keyed by email.
+
+    Heartbeats and frame refs only change the in-memory entry and mark the
+    fields dirty; a flusher thread writes every dirty entry back with one
+    bulk_write per `flush_seconds`. Changes to `durable_fields` (status,
+    isCompleted) are written to Mongo straight away.
+
+    The table assumes it is the only writer of db.live, i.e. a single app
+    process (the Flask server) - enable it with PRESENCE_ENABLED=1 only then.
+
+    Flushes and immediate writes both take `_flush_lock` from popping the
+    dirty fields until Mongo has them, so they land in the order they were
+    popped and a slow flush can't overwrite a newer value.
+    """
+
+    def __init__(self, collection_fn, flush_seconds=15, durable_fields=("status", "isCompleted")):
+        self._collection_fn = collection_fn
+        self.flush_seconds = float(flush_seconds)
+        self.durable_fields = tuple(durable_fields)
+
+        self._entries = {}          # email -> current document (no _id)
+        self._dirty = {}            # email -> {"set": {field, ...}, "unset": {field, ...}}
+        self._loaded_all = False
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self.updates = 0
+        self.immediate_writes = 0
+        self.flushes = 0
+        self.flushed_entries = 0
+
+        self._thread = threading.Thread(target=self._run, name="presence-flusher", daemon=True)
+        self._thread.start()
+
+    # ------------------ Reads ------------------
+    def _load_all(self):
+        if self._loaded_all:
+            return
+        docs = list(self._collection_fn().find({}, {"_id": 0}))
+        with self._lock:
+            for doc in docs:
+                if doc.get("email") and doc["email"] not in self._entries:
+                    self._entries[doc["email"]] = doc
+            self._loaded_all = True
+
+    def get(self, email):
+        """A copy of the candidate's live document, or None."""
+        with self._lock:
+            doc = self._entries.get(email)
+            if doc is not None or self._loaded_all:
+                return copy.deepcopy(doc)
+
+        doc = self._collection_fn().find_one({"email": email}, {"_id": 0})
+        if doc is None:
+            return None
+        with self._lock:
+            doc = self._entries.setdefault(email, doc)
+            return copy.deepcopy(doc)
+
+    def snapshot(self, query=None):
+        """Copies of every entry (matching the simple equality `query`)."""
+        self._load_all()
+        with self._lock:
+            docs = list(self._entries.values())
+            if query:
+                docs = [d for d in docs if all(d.get(k) == v for k, v in query.items())]
+            return copy.deepcopy(docs)
+
+    # ------------------ Writes ------------------
+    def update(self, email, fields, unset=(), upsert=True):
+        """
+        Applies $set `fields` / $unset `unset` to the candidate's entry.
+        Returns True if the change was written to Mongo immediately
+        (a new candidate or a durable field changed), False if it waits
+        for the next flush.
+        """
+        existing = self.get(email)
+        if existing is None and not upsert:
+            return False
+        with self._lock:
+            doc = self._entries.setdefault(email, {"email": email})
+            durable = existing is None or any(
+                f in fields and fields[f] != doc.get(f) for f in self.durable_fields
+            )
+
+            doc.update(fields)
+            for field in unset:
+                doc.pop(field, None)
+
+            dirty = self._dirty.setdefault(email, {"set": set(), "unset": set()})
+            dirty["set"].update(fields)
+            dirty["set"].discard("email")
+            dirty["unset"].difference_update(fields)
+            dirty["unset"].update(f for f in unset if f not in fields)
+            self.updates += 1
+
+        if durable:
+            self._write(email)
+            self.immediate_writes += 1
+        return durable
+
+    def _pop_changes(self, email):
+        """The pending {$set, $unset} for one entry, clearing its dirty marks."""
+        dirty = self._dirty.pop(email, None)
+        doc = self._entries.get(email)
+        if not dirty or doc is None:
+            return None
+        update = {}
+        if dirty["set"]:
+            update["$set"] = {f: copy.deepcopy(doc.get(f)) for f in dirty["set"]}
+        if dirty["unset"]:
+            update["$unset"] = {f: "" for f in dirty["unset"]}
+        return update or None
+
+    def _restore(self, email, update):
+        # A failed write - mark the fields dirty again for the next flush
+        dirty = self._dirty.setdefault(email, {"set": set(), "unset": set()})
+        dirty["set"].update(f for f in update.get("$set", {}) if f not in dirty["unset"])
+        dirty["unset"].update(f for f in update.get("$unset", {}) if f not in dirty["set"])
+
+    def _write(self, email):
+        with self._flush_lock:
+            with self._lock:
+                update = self._pop_changes(email)
+            if update is None:
+                return
+            try:
+                self._collection_fn().update_one({"email": email}, update, upsert=True)
+            except Exception:
+                with self._lock:
+                    self._restore(email, update)
+                raise
+
+    def flush(self):
+        """Writes every dirty entry in one bulk_write. Returns the number of entries."""
+        from pymongo import UpdateOne
+
+        with self._flush_lock:
+            with self._lock:
+                pending = {email: self._pop_changes(email) for email in list(self._dirty)}
+            pending = {email: update for email, update in pending.items() if update}
+            if not pending:
+                return 0
+
+            try:
+                self._collection_fn().bulk_write(
+                    [UpdateOne({"email": email}, update, upsert=True) for email, update in pending.items()],
+                    ordered=False
+                )
+            except Exception:
+                with self._lock:
+                    for email, update in pending.items():
+                        self._restore(email, update)
+                raise
+
+            self.flushes += 1
+            self.flushed_entries += len(pending)
+            return len(pending)
+
+    def _run(self):
+        while not self._closed.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                print("Presence flush failed:", e)
+
+    def close(self):
+        """Stops the flusher and writes whatever is still pending."""
+        self._closed.set()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            dirty = len(self._dirty)
+            entries = len(self._entries)
+        return {
+            "entries": entries,
+            "dirty": dirty,
+            "updates": self.updates,
+            "immediate_writes": self.immediate_writes,
+            "flushes": self.flushes,
+            "flushed_entries": self.flushed_entries,
+        }
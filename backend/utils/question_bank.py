@@ -0,0 +1,94 @@
+import os
+import pickle
+import random
+
+
+class QuestionBank:
+    """
+    Read-only index over the question dataset, built once at startup.
+
+    - per category: list of (question_id, question), duplicates removed
+      (case-insensitive, first occurrence wins)
+    - question_id -> (question, category) dict for O(1) lookups
+
+    Rows are (question_id, question, category) tuples.
+    """
+
+    def __init__(self, rows):
+        self._by_id = {}
+        self._by_category = {}
+        seen = {}
+
+        for question_id, question, category in rows:
+            qid = str(question_id).strip()
+            self._by_id.setdefault(qid, (question, category))
+
+            clean = str(question).lower().strip()
+            seen_in_cat = seen.setdefault(category, set())
+            if clean in seen_in_cat:
+                continue
+            seen_in_cat.add(clean)
+            self._by_category.setdefault(category, []).append((str(question_id), question))
+
+    @classmethod
+    def from_dataframe(cls, df):
+        return cls(zip(df["question_id"], df["question"], df["category"]))
+
+    @classmethod
+    def load(cls, excel_path, cache_path=None):
+        """
+        Builds the bank from the Excel dataset. With cache_path, the rows are
+        kept in a pickle stamped with the Excel file's size/mtime, so later
+        boots skip parsing the spreadsheet until it changes.
+        """
+        st = os.stat(excel_path)
+        stamp = (st.st_size, st.st_mtime_ns)
+
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    cached = pickle.load(f)
+                if cached.get("stamp") == stamp:
+                    return cls(cached["rows"])
+            except Exception as e:
+                print("Question cache unreadable, rebuilding:", e)
+
+        import pandas as pd
+        df = pd.read_excel(excel_path)
+        rows = [
+            (qid.item() if hasattr(qid, "item") else qid, question, category)
+            for qid, question, category in zip(df["question_id"], df["question"], df["category"])
+        ]
+
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"stamp": stamp, "rows": rows}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+
+        return cls(rows)
+
+    def lookup(self, question_id):
+        """Returns (question, category) or None."""
+        return self._by_id.get(str(question_id).strip())
+
+    def sample(self, category, k, rng=random):
+        """
+        Draws up to k distinct questions from a category.
+        random.sample only touches k slots of a large pool, so this stays
+        O(k) however big the bank gets.
+        """
+        pool = self._by_category.get(category, [])
+        picked = rng.sample(pool, min(k, len(pool)))
+        return [
+            {"question_id": qid, "question": question, "category": category}
+            for qid, question in picked
+        ]
+
+    @property
+    def categories(self):
+        return list(self._by_category)
+
+    def __len__(self):
+        return len(self._by_id)
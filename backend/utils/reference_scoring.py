@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.npy"
+LABELS_FILE = "labels.npy"
+INDEX_FILE = "index.json"
+
+
+class ReferenceBank:
+    """
+    Graded reference answers (score 0/1/2) per question, as one L2-normalised
+    float32 matrix. Each question owns a contiguous block of rows, so scoring
+    an answer is a single dot product against that block.
+
+    The matrix is saved as .npy and opened with mmap_mode="r", so every
+    worker process shares the same pages.
+    """
+
+    def __init__(self, embeddings, labels, index, classes):
+        self.embeddings = embeddings
+        self.labels = labels
+        self.index = index          # question_id -> (start, end)
+        self.classes = classes      # sorted class values, column order of probabilities
+
+    def has(self, question_id):
+        return str(question_id).strip() in self.index
+
+    def probabilities(self, question_id, answer_embeddings, temperature=0.05):
+        """
+        (k, d) answer embeddings -> (k, n_classes) probabilities.
+        Each class is represented by its closest reference answer; the
+        similarities are turned into probabilities with a softmax.
+        """
+        start, end = self.index[str(question_id).strip()]
+        refs = self.embeddings[start:end]
+        labels = self.labels[start:end]
+
+        E = np.asarray(answer_embeddings, dtype=np.float32)
+        E = E / np.clip(np.linalg.norm(E, axis=1, keepdims=True), 1e-12, None)
+        sims = E @ refs.T                                   # (k, m)
+
+        class_sims = np.full((E.shape[0], len(self.classes)), -np.inf, dtype=np.float32)
+        for ci, cls in enumerate(self.classes):
+            mask = labels == cls
+            if mask.any():
+                class_sims[:, ci] = sims[:, mask].max(axis=1)
+
+        logits = class_sims / temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        weights = np.exp(logits)                            # exp(-inf) == 0 for classes with no references
+        return weights / weights.sum(axis=1, keepdims=True)
+
+    # ------------------ Build / load ------------------
+    @classmethod
+    def load(cls, directory):
+        embeddings = np.load(os.path.join(directory, EMBEDDINGS_FILE), mmap_mode="r")
+        labels = np.load(os.path.join(directory, LABELS_FILE))
+        with open(os.path.join(directory, INDEX_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        index = {qid: tuple(span) for qid, span in meta["index"].items()}
+        return cls(embeddings, labels, index, meta["classes"])
+
+    @classmethod
+    def build(cls, rows, encode_fn, directory):
+        """
+        rows: (question_id, cleaned_answer, score) tuples; encode_fn: list of
+        texts -> (n, d) embeddings. Writes the files into `directory` and
+        returns the memory-mapped bank.
+        """
+        seen = set()
+        unique = []
+        for qid, answer, score in rows:
+            qid = str(qid).strip()
+            if not answer or (qid, answer) in seen:
+                continue
+            seen.add((qid, answer))
+            unique.append((qid, answer, int(score)))
+
+        # Contiguous block per question
+        unique.sort(key=lambda r: (r[0], r[2]))
+
+        embeddings = np.asarray(encode_fn([a for _, a, _ in unique]), dtype=np.float32)
+        embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        labels = np.array([s for _, _, s in unique], dtype=np.int64)
+
+        index = {}
+        for i, (qid, _, _) in enumerate(unique):
+            start, _ = index.get(qid, (i, i))
+            index[qid] = (start, i + 1)
+
+        # Write to a temp folder and rename, so other workers never see half a bank
+        tmp_dir = f"{directory}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        np.save(os.path.join(tmp_dir, EMBEDDINGS_FILE), embeddings)
+        np.save(os.path.join(tmp_dir, LABELS_FILE), labels)
+        with open(os.path.join(tmp_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump({"index": index, "classes": sorted(set(labels.tolist()))}, f)
+
+        try:
+            os.replace(tmp_dir, directory)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)   # another worker finished first
+
+        return cls.load(directory)
+
+    @classmethod
+    def load_or_build(cls, directory, rows_fn, encode_fn):
+        if not os.path.exists(os.path.join(directory, INDEX_FILE)):
+            os.makedirs(os.path.dirname(directory) or ".", exist_ok=True)
+            return cls.build(rows_fn(), encode_fn, directory)
+        return cls.load(directory)
@@ -0,0 +1,226 @@
+import base64
+import gzip
+import json
+import zlib
+from datetime import date, datetime
+
+from bson import ObjectId
+
+try:
+    import orjson
+except ImportError:     # optional - the stdlib encoder gives the same output, slower
+    orjson = None
+
+try:
+    import brotli
+except ImportError:     # optional - gzip only
+    brotli = None
+
+COMPRESS_MIN_BYTES = 1024
+CHUNK_BYTES = 64 * 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+# ------------------ JSON ------------------
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    if isinstance(value, datetime):
+        # Naive datetimes in Mongo are UTC
+        if value.tzinfo is None:
+            return value.isoformat() + "Z"
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if hasattr(value, "item"):      # numpy scalars
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """JSON bytes; datetimes as ISO 8601 (naive = UTC, 'Z'), ObjectId as str, bytes as base64."""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(obj):
+        """JSON bytes; datetimes as ISO 8601 (naive = UTC, 'Z'), ObjectId as str, bytes as base64."""
+        return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+# ------------------ Compression ------------------
+def choose_encoding(accept_encoding, size=None):
+    """
+    'br', 'gzip' or None for an Accept-Encoding header (q=0 means refused).
+    A body of known `size` under COMPRESS_MIN_BYTES is never compressed.
+    """
+    if size is not None and size < COMPRESS_MIN_BYTES:
+        return None
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.lower()] = q
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", accepted.get("*", 0)) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+class ChunkEncoder:
+    """
+    Collects serialized pieces into ~CHUNK_BYTES chunks, compressed on the
+    fly when `encoding` is set - a streamed response never holds more than
+    one chunk.
+    """
+
+    def __init__(self, encoding=None, chunk_bytes=CHUNK_BYTES):
+        self.chunk_bytes = chunk_bytes
+        self._buffer = bytearray()
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress, self._flush = self._compressor.process, self._compressor.finish
+        elif encoding == "gzip":
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)     # 31: gzip container
+            self._compress, self._flush = self._compressor.compress, self._compressor.flush
+        else:
+            self._compress = self._flush = None
+
+    def _emit(self, data):
+        return self._compress(data) if self._compress else data
+
+    def feed(self, data):
+        """Adds bytes; returns a chunk to send (possibly b"")."""
+        self._buffer += data
+        if len(self._buffer) < self.chunk_bytes:
+            return b""
+        chunk = self._emit(bytes(self._buffer))
+        self._buffer.clear()
+        return chunk
+
+    def finish(self):
+        chunk = self._emit(bytes(self._buffer)) if self._buffer else b""
+        self._buffer.clear()
+        return chunk + self._flush() if self._flush else chunk
+
+
+# ------------------ Streaming ------------------
+# A stream starts with prefetch(): enough items are serialized up front to
+# know whether the body reaches COMPRESS_MIN_BYTES before the
+# Content-Encoding header has to be chosen. size is None when there is more.
+def prefetch(items, min_bytes=COMPRESS_MIN_BYTES):
+    """(serialized head items, iterator over the rest, head size or None)."""
+    rest = iter(items)
+    head, size = [], 0
+    for item in rest:
+        head.append(dumps(item))
+        size += len(head[-1])
+        if size >= min_bytes:
+            return head, rest, None
+    return head, rest, size + len(head) + 1       # + commas/newlines and brackets
+
+
+async def aprefetch(items, min_bytes=COMPRESS_MIN_BYTES):
+    """prefetch() over an async iterable (an async driver cursor)."""
+    rest = items.__aiter__()
+    head, size = [], 0
+    async for item in rest:
+        head.append(dumps(item))
+        size += len(head[-1])
+        if size >= min_bytes:
+            return head, rest, None
+    return head, rest, size + len(head) + 1
+
+
+def _array_piece(separator, data):
+    return separator + data, b","
+
+
+def stream_json_array(head, rest, encoding=None):
+    """Yields a JSON array of the prefetched `head` then `rest` (e.g. a cursor), chunk by chunk."""
+    encoder = ChunkEncoder(encoding)
+    separator = b"["
+    for data in head:
+        piece, separator = _array_piece(separator, data)
+        chunk = encoder.feed(piece)
+        if chunk:
+            yield chunk
+    for item in rest:
+        piece, separator = _array_piece(separator, dumps(item))
+        chunk = encoder.feed(piece)
+        if chunk:
+            yield chunk
+    tail = encoder.feed(b"[]" if separator == b"[" else b"]") + encoder.finish()
+    if tail:
+        yield tail
+
+
+def stream_ndjson(head, rest, encoding=None):
+    """Yields one JSON document per line, chunk by chunk."""
+    encoder = ChunkEncoder(encoding)
+    for data in head:
+        chunk = encoder.feed(data + b"\n")
+        if chunk:
+            yield chunk
+    for item in rest:
+        chunk = encoder.feed(dumps(item) + b"\n")
+        if chunk:
+            yield chunk
+    tail = encoder.finish()
+    if tail:
+        yield tail
+
+
+async def astream_json_array(head, rest, encoding=None):
+    """stream_json_array() over an async iterable."""
+    encoder = ChunkEncoder(encoding)
+    separator = b"["
+    for data in head:
+        piece, separator = _array_piece(separator, data)
+        chunk = encoder.feed(piece)
+        if chunk:
+            yield chunk
+    async for item in rest:
+        piece, separator = _array_piece(separator, dumps(item))
+        chunk = encoder.feed(piece)
+        if chunk:
+            yield chunk
+    tail = encoder.feed(b"[]" if separator == b"[" else b"]") + encoder.finish()
+    if tail:
+        yield tail
+
+
+async def astream_ndjson(head, rest, encoding=None):
+    encoder = ChunkEncoder(encoding)
+    for data in head:
+        chunk = encoder.feed(data + b"\n")
+        if chunk:
+            yield chunk
+    async for item in rest:
+        chunk = encoder.feed(dumps(item) + b"\n")
+        if chunk:
+            yield chunk
+    tail = encoder.finish()
+    if tail:
+        yield tail
@@ -0,0 +1,299 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - fall back to in-process locking only
+    fcntl = None
+
+
+def text_key(cleaned_text):
+    return hashlib.sha1(cleaned_text.encode("utf-8")).hexdigest()
+
+
+def artifact_fingerprint(paths, *extra):
+    """
+    Short hash of the files (path, size, mtime) and extra labels a cached
+    result depends on. Any change to them gives a new fingerprint.
+    """
+    h = hashlib.sha1()
+    for path in paths:
+        h.update(os.path.abspath(path).encode("utf-8"))
+        try:
+            st = os.stat(path)
+            h.update(f"{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+        except OSError:
+            h.update(b"missing")
+    for label in extra:
+        h.update(str(label).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class LRUCache:
+    """
+    Thread-safe LRU with a size limit and a per-entry TTL.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=3600):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_seconds) if ttl_seconds else None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only store of float32 embeddings shared between processes.
+
+    <dir>/embeddings.f32 - raw rows, read through np.memmap
+    <dir>/keys.txt       - one key per line, line number == row number
+
+    The embedding row is written before its key, so readers never see a key
+    whose row is not on disk yet. Writers hold the file lock and first cut
+    both files back to the last complete key: rows (or a half line) left by
+    a write that crashed or hit a full disk are overwritten instead of
+    shifting every later key onto the wrong row.
+    """
+
+    def __init__(self, directory, dim, max_rows=1_000_000):
+        self.directory = directory
+        self.dim = int(dim)
+        self.max_rows = int(max_rows)
+        os.makedirs(directory, exist_ok=True)
+
+        self._emb_path = os.path.join(directory, "embeddings.f32")
+        self._keys_path = os.path.join(directory, "keys.txt")
+        self._lock_path = os.path.join(directory, "lock")
+
+        self._index = {}
+        self._keys_offset = 0
+        self._row_count = 0
+        self._mmap = None
+        self._lock = threading.Lock()
+
+        for path in (self._emb_path, self._keys_path):
+            open(path, "ab").close()
+        self._refresh_index()
+
+    def get(self, key):
+        with self._lock:
+            row = self._index.get(key)
+            if row is None and self._refresh_index():
+                row = self._index.get(key)
+            if row is None:
+                return None
+            return np.array(self._rows(row + 1)[row])
+
+    def put_many(self, keys, embeddings):
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock, self._file_lock():
+            self._refresh_index()
+            new = {}
+            for k, e in zip(keys, embeddings):
+                if k not in self._index:
+                    new.setdefault(k, e)
+            new = list(new.items())
+            room = self.max_rows - self._row_count
+            new = new[:max(0, room)]
+            if not new:
+                return
+
+            # Rows go at the offset the key count says, not at the end of the file
+            with open(self._emb_path, "r+b") as f:
+                f.truncate(self._row_count * self.dim * 4)
+                f.seek(0, os.SEEK_END)
+                f.write(b"".join(e.tobytes() for _, e in new))
+            with open(self._keys_path, "r+b") as f:
+                f.truncate(self._keys_offset)
+                f.seek(0, os.SEEK_END)
+                f.write("".join(f"{k}\n" for k, _ in new).encode("ascii"))
+
+            self._refresh_index()
+
+    def __len__(self):
+        return len(self._index)
+
+    # ------------------ Internals ------------------
+    def _refresh_index(self):
+        """Picks up keys appended by this or other processes. Returns True if any were added."""
+        size = os.path.getsize(self._keys_path)
+        if size <= self._keys_offset:
+            return False
+
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            chunk = f.read(size - self._keys_offset)
+
+        # Only consume complete lines
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return False
+        for line in chunk[:end].decode("ascii").splitlines():
+            self._index.setdefault(line, self._row_count)
+            self._row_count += 1
+        self._keys_offset += end
+        return True
+
+    def _rows(self, needed):
+        if self._mmap is None or self._mmap.shape[0] < needed:
+            rows = os.path.getsize(self._emb_path) // (4 * self.dim)
+            self._mmap = np.memmap(self._emb_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def _file_lock(self):
+        return _FileLock(self._lock_path)
+
+
+class _FileLock:
+    def __init__(self, path):
+        self.path = path
+        self._f = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._f = open(self.path, "a")
+            fcntl.flock(self._f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._f is not None:
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+            self._f.close()
+            self._f = None
+
+
+class ScoreCache:
+    """
+    Two-tier cache for answer scoring, keyed by a hash of the cleaned text.
+
+    - memory tier: LRU of final result dicts (size + TTL eviction)
+    - disk tier (optional): memory-mapped float32 embeddings, shared by all
+      workers and kept across restarts, so only predict_proba has to run
+
+    Scores belong to a fingerprint of the loaded classifier + embedder and
+    embeddings to a fingerprint of the embedder alone. A new score fingerprint
+    empties the memory tier; a new embedding fingerprint switches to a fresh
+    disk folder.
+    """
+
+    def __init__(self, fingerprint, embedding_fingerprint=None, max_entries=10000,
+                 ttl_seconds=3600, disk_dir=None, dim=None, max_disk_rows=1_000_000):
+        self._memory = LRUCache(max_entries, ttl_seconds)
+        self._disk_root = disk_dir
+        self._dim = dim
+        self._max_disk_rows = max_disk_rows
+        self._disk = None
+        self.fingerprint = None
+        self.embedding_fingerprint = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.set_fingerprint(fingerprint, embedding_fingerprint)
+
+    def set_fingerprint(self, fingerprint, embedding_fingerprint=None):
+        embedding_fingerprint = embedding_fingerprint or fingerprint
+
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self._memory.clear()
+
+        if embedding_fingerprint == self.embedding_fingerprint:
+            return
+        self.embedding_fingerprint = embedding_fingerprint
+        self._open_disk()
+
+    def set_dim(self, dim):
+        """Embedding size, for when the embedder is loaded after the cache is created."""
+        if dim != self._dim:
+            self._dim = dim
+            self._open_disk()
+
+    def _open_disk(self):
+        self._disk = None
+        if self._disk_root and self._dim and self.embedding_fingerprint:
+            self._disk = DiskEmbeddingStore(
+                os.path.join(self._disk_root, self.embedding_fingerprint),
+                self._dim,
+                max_rows=self._max_disk_rows,
+            )
+
+    def get_score(self, key):
+        value = self._memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return _copy_result(value)
+        return None
+
+    def put_score(self, key, result):
+        self._memory.put(key, _copy_result(result))
+
+    def get_embedding(self, key):
+        if self._disk is None:
+            return None
+        emb = self._disk.get(key)
+        if emb is not None:
+            self.disk_hits += 1
+        return emb
+
+    def put_embeddings(self, keys, embeddings):
+        if self._disk is not None and len(keys):
+            self._disk.put_many(keys, embeddings)
+
+    def clear_memory(self):
+        self._memory.clear()
+
+    def record_miss(self, n=1):
+        self.misses += n
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "fingerprint": self.fingerprint,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk) if self._disk is not None else None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _copy_result(result):
+    copied = dict(result)
+    if "probabilities" in copied:
+        copied["probabilities"] = list(copied["probabilities"])
+    return copied
@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchScorer:
+    """
+    Collects scoring requests from concurrent threads and runs them through
+    `batch_fn` (list of inputs -> list of results) in a single call.
+    A batch is flushed once it holds `max_batch_size` items or the oldest
+    item has waited `max_wait_ms` milliseconds.
+    `concurrency` flusher threads can run batches at the same time (e.g. one
+    per scoring worker process).
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=10.0, name="batch-scorer", concurrency=1):
+        self._batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._pending = []          # [(item, future, enqueued_at)]
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.batches = 0
+        self.items = 0
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, int(concurrency)))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # ------------------ Public API ------------------
+    def submit(self, item):
+        return self.submit_many([item])[0]
+
+    def submit_many(self, items):
+        futures = []
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchScorer is closed")
+            for item in items:
+                fut = Future()
+                self._pending.append((item, fut, now))
+                futures.append(fut)
+            self._cond.notify()
+        return futures
+
+    def score(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def score_many(self, items, timeout=None):
+        futures = self.submit_many(list(items))
+        return [f.result(timeout) for f in futures]
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "pending": pending,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def close(self, timeout=None):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    # ------------------ Worker ------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+
+                if not self._pending:
+                    return  # closed and drained
+
+                # Wait for the batch to fill up, but never past the oldest item's deadline
+                while self._pending and len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = self._pending[0][2] + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                if not self._pending:
+                    continue  # another flusher took it
+
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        items = [b[0] for b in batch]
+        try:
+            results = self._batch_fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"batch_fn returned {len(results)} results for {len(items)} inputs"
+                )
+        except Exception as e:
+            for _, fut, _ in batch:
+                fut.set_exception(e)
+            return
+
+        with self._cond:
+            self.batches += 1
+            self.items += len(items)
+        for (_, fut, _), result in zip(batch, results):
+            fut.set_result(result)
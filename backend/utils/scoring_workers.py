@@ -0,0 +1,268 @@
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+def embed_and_classify(embedder, classifier, texts, embeddings=None, classify=True):
+    """
+    Encodes `texts`, then runs predict_proba on the new embeddings followed by
+    the already known `embeddings`. Returns (new_embeddings, probas) as float32;
+    probas is None when classify is False.
+    """
+    parts = []
+    new_embeddings = None
+    if texts:
+        new_embeddings = np.asarray(embedder.encode(list(texts)), dtype=np.float32)
+        parts.append(new_embeddings)
+    if not classify:
+        return new_embeddings, None
+    if embeddings is not None and len(embeddings):
+        parts.append(np.asarray(embeddings, dtype=np.float32))
+    if not parts:
+        return new_embeddings, np.zeros((0, len(classifier.classes_)), dtype=np.float32)
+
+    probas = classifier.predict_proba(np.vstack(parts)).astype(np.float32)
+    return new_embeddings, probas
+
+
+# ------------------ Worker process ------------------
+def _worker_main(conn, config, cpus):
+    # For libraries loaded from here on (torch, onnxruntime). numpy's BLAS is
+    # already loaded by the time this runs, so its pool is capped below.
+    threads = str(config["torch_threads"])
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = threads
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    import joblib
+    from threadpoolctl import threadpool_limits
+    from utils.embedders import load_embedder
+
+    try:
+        import torch
+        torch.set_num_threads(config["torch_threads"])
+    except ImportError:
+        pass
+
+    try:
+        embedder = load_embedder(
+            config["embedder_backend"], config["embedder_name"], config["onnx_dir"],
+            num_threads=config["torch_threads"],
+        )
+        classifier = joblib.load(config["model_path"])
+        # Every BLAS/OpenMP pool loaded so far (numpy, scipy, torch) - for the life of the worker
+        threadpool_limits(limits=config["torch_threads"])
+        embed_and_classify(embedder, classifier, ["warm up"])
+    except Exception as e:
+        conn.send(("error", repr(e)))
+        return
+
+    conn.send(("ready", {
+        "pid": os.getpid(),
+        "dim": embedder.get_sentence_embedding_dimension(),
+        "classes": np.asarray(classifier.classes_).tolist(),
+    }))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        kind = msg[0]
+        if kind == "ping":
+            conn.send(("pong", None))
+        elif kind == "score":
+            _, texts, embeddings, classify = msg
+            try:
+                conn.send(("ok", embed_and_classify(embedder, classifier, texts, embeddings, classify)))
+            except Exception as e:
+                conn.send(("error", repr(e)))
+        elif kind == "stop":
+            return
+
+
+class _Worker:
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.info = {}
+        self.served = 0
+        self.restarts = -1
+        self.timeouts = 0
+
+
+class ScoringWorkerPool:
+    """
+    N pre-forked processes, each holding its own embedder + classifier, so
+    tokenization and sklearn calls run outside this process's GIL.
+
+    run() hands a batch to an idle worker over a pipe and waits up to
+    `call_timeout` seconds for the float32 arrays; a worker that doesn't
+    answer in time is killed and restarted and the batch fails. A monitor
+    thread pings idle workers and replaces any that died or stopped answering.
+    """
+
+    def __init__(self, num_workers, config, torch_threads=1, pin_cpus=False,
+                 start_timeout=300, health_interval=10, ping_timeout=5, call_timeout=60):
+        self.num_workers = max(1, int(num_workers))
+        self.config = dict(config, torch_threads=max(1, int(torch_threads)))
+        self.pin_cpus = pin_cpus
+        self.start_timeout = start_timeout
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.call_timeout = call_timeout
+
+        self._ctx = mp.get_context("spawn")   # fork + torch threads is unsafe
+        self._workers = [_Worker(i) for i in range(self.num_workers)]
+        self._idle = queue.Queue()
+        self._closed = False
+        self.dim = None
+        self.classes = None
+
+        for worker in self._workers:
+            self._start(worker)
+            self._idle.put(worker)
+
+        self._monitor = threading.Thread(target=self._monitor_loop, name="scoring-workers-monitor", daemon=True)
+        self._monitor.start()
+
+    # ------------------ Public API ------------------
+    def run(self, texts, embeddings=None, classify=True, timeout=None):
+        """Same contract as embed_and_classify, executed in a worker process."""
+        msg = ("score", list(texts), embeddings, classify)
+        worker = self._idle.get(timeout=timeout)
+        try:
+            try:
+                result = self._call(worker, msg)
+            except TimeoutError:
+                # Hung, not crashed - the same batch would likely hang again
+                print(f"⚠️ Scoring worker {worker.index} did not answer in {self.call_timeout}s, restarting")
+                worker.timeouts += 1
+                self._start(worker)
+                raise
+            except (EOFError, OSError, BrokenPipeError):
+                # Worker crashed mid-request - replace it and retry once
+                self._start(worker)
+                result = self._call(worker, msg)
+        finally:
+            self._idle.put(worker)
+        return result
+
+    def check_health(self):
+        """Pings every idle worker and restarts the ones that are dead or hung."""
+        for _ in range(self.num_workers):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if not worker.process.is_alive():
+                    raise EOFError("worker died")
+                worker.conn.send(("ping",))
+                if not worker.conn.poll(self.ping_timeout):
+                    raise TimeoutError("worker did not answer ping")
+                worker.conn.recv()
+            except Exception as e:
+                print(f"⚠️ Scoring worker {worker.index} unhealthy ({e}), restarting")
+                self._start(worker)
+            finally:
+                self._idle.put(worker)
+
+    def stats(self):
+        return {
+            "workers": [
+                {
+                    "index": w.index,
+                    "pid": w.info.get("pid"),
+                    "alive": bool(w.process and w.process.is_alive()),
+                    "served": w.served,
+                    "restarts": w.restarts,
+                    "timeouts": w.timeouts,
+                }
+                for w in self._workers
+            ],
+            "idle": self._idle.qsize(),
+            "torch_threads": self.config["torch_threads"],
+        }
+
+    def close(self):
+        self._closed = True
+        for worker in self._workers:
+            try:
+                worker.conn.send(("stop",))
+            except Exception:
+                pass
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+    # ------------------ Internals ------------------
+    def _call(self, worker, msg):
+        worker.conn.send(msg)
+        if not worker.conn.poll(self.call_timeout):
+            raise TimeoutError(f"scoring worker {worker.index} did not answer in {self.call_timeout}s")
+        status, payload = worker.conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"scoring worker {worker.index}: {payload}")
+        worker.served += 1
+        return payload
+
+    def _cpus_for(self, index):
+        if not self.pin_cpus or not hasattr(os, "sched_getaffinity"):
+            return None
+        available = sorted(os.sched_getaffinity(0))
+        per_worker = self.config["torch_threads"]
+        start = (index * per_worker) % len(available)
+        return set(available[start:start + per_worker]) or None
+
+    def _start(self, worker):
+        if worker.process is not None:
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join(timeout=5)
+            worker.conn.close()
+
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.config, self._cpus_for(worker.index)),
+            name=f"scoring-worker-{worker.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        if not parent_conn.poll(self.start_timeout):
+            process.terminate()
+            raise RuntimeError(f"scoring worker {worker.index} did not start in {self.start_timeout}s")
+        status, info = parent_conn.recv()
+        if status != "ready":
+            process.join(timeout=5)
+            raise RuntimeError(f"scoring worker {worker.index} failed to start: {info}")
+
+        worker.process = process
+        worker.conn = parent_conn
+        worker.info = info
+        worker.restarts += 1
+        self.dim = info["dim"]
+        self.classes = info["classes"]
+
+    def _monitor_loop(self):
+        while not self._closed:
+            time.sleep(self.health_interval)
+            if self._closed:
+                return
+            try:
+                self.check_health()
+            except Exception as e:
+                print("Scoring worker health check failed:", e)
@@ -0,0 +1,107 @@
+import threading
+import time
+
+
+class LazyProxy:
+    """
+    Stands in for an object that is created later (e.g. the Mongo database),
+    so module-level names like `db` keep working: `db.results` resolves the
+    real object on first attribute access.
+    """
+
+    def __init__(self, resolve):
+        object.__setattr__(self, "_resolve", resolve)
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __getitem__(self, key):
+        return self._resolve()[key]
+
+
+class _Component:
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.state = "pending"      # pending -> loading -> ready | failed
+        self.value = None
+        self.error = None
+        self.seconds = None
+        self.lock = threading.Lock()
+
+
+class ComponentRegistry:
+    """
+    Heavy startup artifacts (models, dataset, db connection) registered by
+    name and loaded on demand, in a background thread, or eagerly.
+
+    get() loads a component in the calling thread if nobody has started it
+    yet, or waits for the thread that is loading it. A failed component is
+    retried on the next get().
+    """
+
+    def __init__(self):
+        self._components = {}
+
+    def register(self, name, loader):
+        self._components[name] = _Component(name, loader)
+
+    def get(self, name):
+        comp = self._components[name]
+        if comp.state == "ready":
+            return comp.value
+
+        with comp.lock:
+            if comp.state != "ready":
+                self._load(comp)
+            if comp.state == "failed":
+                raise RuntimeError(f"{name} failed to load: {comp.error}")
+            return comp.value
+
+    def load_all(self):
+        for name in self._components:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"⚠️ Startup: {e}")
+
+    def start_background(self):
+        thread = threading.Thread(target=self.load_all, name="startup-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self, name=None):
+        names = [name] if name else list(self._components)
+        return all(self._components[n].state == "ready" for n in names)
+
+    def not_ready(self, include_pending=True):
+        """
+        Names of components that are loading or failed - plus the ones
+        nobody has asked for yet, unless include_pending is False (lazy mode,
+        where a pending component loads on its first request).
+        """
+        blocking = {"loading", "failed"} | ({"pending"} if include_pending else set())
+        return [name for name, comp in self._components.items() if comp.state in blocking]
+
+    def status(self):
+        return {
+            name: {
+                "state": comp.state,
+                "seconds": comp.seconds,
+                "error": comp.error,
+            }
+            for name, comp in self._components.items()
+        }
+
+    def _load(self, comp):
+        comp.state = "loading"
+        comp.error = None
+        start = time.perf_counter()
+        try:
+            comp.value = comp.loader()
+            comp.state = "ready"
+        except Exception as e:
+            comp.state = "failed"
+            comp.error = str(e)
+        comp.seconds = round(time.perf_counter() - start, 3)
+        print(f"Startup: {comp.name} {comp.state} in {comp.seconds}s")
@@ -0,0 +1,67 @@
+import re
+from collections import deque
+
+
+class VocabularyGate:
+    """
+    Answers "does this text contain any term the TF-IDF vectorizer knows?"
+    without building a sparse matrix.
+
+    Same decision as `vectorizer.transform([text]).nnz > 0` (TF-IDF weights
+    of known terms are never zero): text goes through the vectorizer's own
+    preprocessor, token pattern, stop words and ngram_range, and the scan
+    stops at the first term found in the vocabulary.
+    """
+
+    def __init__(self, vectorizer):
+        self.vocabulary = frozenset(vectorizer.vocabulary_)
+        self.min_n, self.max_n = vectorizer.ngram_range
+
+        if vectorizer.analyzer == "word" and vectorizer.tokenizer is None:
+            self._preprocess = vectorizer.build_preprocessor()
+            pattern = re.compile(vectorizer.token_pattern)
+            if pattern.groups > 1:
+                raise ValueError("token_pattern should have at most one capturing group")
+            self._token_group = 1 if pattern.groups == 1 else 0
+            self._pattern = pattern
+            stop_words = vectorizer.get_stop_words()
+            self._stop_words = frozenset(stop_words) if stop_words else None
+            self._analyzer = None
+        else:
+            # char n-grams / custom analyzers: use sklearn's analyzer as-is
+            self._analyzer = vectorizer.build_analyzer()
+
+    def accepts(self, text):
+        if self._analyzer is not None:
+            vocab = self.vocabulary
+            return any(term in vocab for term in self._analyzer(text))
+        return self._scan_words(text)
+
+    def accepts_many(self, texts):
+        return [self.accepts(t) for t in texts]
+
+    def _scan_words(self, text):
+        vocab = self.vocabulary
+        min_n, max_n = self.min_n, self.max_n
+        stop_words = self._stop_words
+        group = self._token_group
+
+        window = deque(maxlen=max_n)
+        for match in self._pattern.finditer(self._preprocess(text)):
+            token = match.group(group)
+            if stop_words is not None and token in stop_words:
+                continue
+
+            if max_n == 1:
+                if token in vocab:
+                    return True
+                continue
+
+            # Every n-gram that ends at this token
+            window.append(token)
+            size = len(window)
+            for n in range(min_n, min(max_n, size) + 1):
+                term = token if n == 1 else " ".join([window[i] for i in range(size - n, size)])
+                if term in vocab:
+                    return True
+        return False
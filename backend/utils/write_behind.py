@@ -0,0 +1,287 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime
+
+from bson import json_util
+
+_FLUSH_MARKER = object()
+
+
+class WriteBehindBusy(Exception):
+    """The queue stayed full, or a write was not confirmed, within the timeout."""
+
+
+class WriteBehindQueue:
+    """
+    Takes Mongo writes off the request path.
+
+    submit() puts (collection, write model, after-callback) on a bounded
+    queue and returns a Future; a writer thread takes up to
+    `max_batch_size` queued writes (or whatever arrived within
+    `max_wait_ms` of the first one) and sends them with one ordered
+    bulk_write per collection, then runs the callbacks in order.
+
+    Nothing the client was told is saved gets dropped: connection errors
+    are retried in order, with backoff up to `max_backoff` seconds, until
+    Mongo is back (close() gives up after `retries` more attempts). A write
+    the server rejects is appended to `spill_path` (JSON lines) and its
+    Future fails; the writes before and after it go through as usual.
+
+    When the queue is full, submit() waits up to `wait_timeout` seconds for
+    room (backpressure), so writes always reach Mongo in submission order,
+    then raises WriteBehindBusy. Writes submitted with a `key` can be waited
+    on with wait_for(key) (read-your-writes for one session); flush() waits
+    for everything. Both give up with WriteBehindBusy after `wait_timeout`.
+    """
+
+    def __init__(self, db_fn, max_queue=10000, max_batch_size=500, max_wait_ms=50,
+                 retries=3, max_backoff=30.0, spill_path=None, wait_timeout=5.0):
+        self._db_fn = db_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.retries = retries
+        self.max_backoff = max_backoff
+        self.spill_path = spill_path
+        self.wait_timeout = wait_timeout
+
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._closed = False
+        self._lock = threading.Lock()
+        self._pending = {}      # key -> Future of the last write submitted with it
+
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.retried = 0
+        self.rejected = 0
+        self.full_waits = 0
+        self._flush_latencies = deque(maxlen=500)
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    # ------------------ Public API ------------------
+    def submit(self, collection, operation, after=None, wait=False, key=None):
+        """
+        operation: a pymongo write model (InsertOne, UpdateOne, ...).
+        after: callable run once the write is done (e.g. dependent updates).
+        wait=True blocks until the write is in Mongo.
+        key: lets wait_for(key) wait on this write (e.g. a session id).
+        """
+        fut = Future()
+        item = (collection, operation, after, fut)
+        if self._closed:
+            raise RuntimeError("WriteBehindQueue is closed")
+
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Writer can't keep up - wait for room rather than jump the queue
+            with self._lock:
+                self.full_waits += 1
+            try:
+                self._queue.put(item, timeout=self.wait_timeout)
+            except queue.Full:
+                raise WriteBehindBusy("write queue is full")
+        with self._lock:
+            self.submitted += 1
+            if key is not None:
+                self._pending[key] = fut
+        if key is not None:
+            fut.add_done_callback(lambda f: self._forget(key, f))
+
+        if wait:
+            self._wait(fut)
+        return fut
+
+    def wait_for(self, key):
+        """Blocks until the writes submitted with `key` are done (written or spilled)."""
+        with self._lock:
+            fut = self._pending.get(key)
+        if fut is not None:
+            self._wait(fut, raise_errors=False)
+
+    def flush(self):
+        """Blocks until every write submitted before this call is done."""
+        if self._closed:
+            return
+        fut = Future()
+        try:
+            self._queue.put((_FLUSH_MARKER, None, None, fut), timeout=self.wait_timeout)
+        except queue.Full:
+            raise WriteBehindBusy("write queue is full")
+        self._wait(fut)
+
+    def _wait(self, fut, raise_errors=True):
+        # Writes are applied in order, so the last one being done means the earlier ones are too
+        try:
+            error = fut.exception(self.wait_timeout)
+        except FutureTimeout:
+            raise WriteBehindBusy("write not confirmed in time")
+        if error is not None and raise_errors:
+            raise error
+
+    def _forget(self, key, fut):
+        with self._lock:
+            if self._pending.get(key) is fut:
+                del self._pending[key]
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._flush_latencies)
+            submitted, written, batches = self.submitted, self.written, self.batches
+            retried, rejected, full_waits = self.retried, self.rejected, self.full_waits
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2) if latencies else 0.0
+
+        return {
+            "depth": self._queue.qsize(),
+            "submitted": submitted,
+            "written": written,
+            "batches": batches,
+            "retried": retried,
+            "rejected": rejected,
+            "full_waits": full_waits,
+            "flush_ms_p50": pct(0.5),
+            "flush_ms_p95": pct(0.95),
+        }
+
+    def close(self, timeout=30):
+        """Stops accepting writes, drains the queue and stops the writer."""
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    # ------------------ Writer ------------------
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return self._drain()
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._write_batch(batch)
+            if stop:
+                return self._drain()
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+        for start in range(0, len(batch), self.max_batch_size):
+            self._write_batch(batch[start:start + self.max_batch_size])
+
+    def _write_group(self, collection, items):
+        """
+        Ordered bulk_write of one collection's items. Returns {index: error}
+        for the items that were not written (rejected, or spilled at close).
+        """
+        from pymongo.errors import BulkWriteError
+
+        failed = {}
+        start, attempt = 0, 0
+        while start < len(items):
+            try:
+                self._db_fn()[collection].bulk_write([op for _, op, _, _ in items[start:]], ordered=True)
+                break
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors") or []
+                if not write_errors:
+                    # Write concern error only - the writes themselves were applied
+                    print(f"⚠️ Write-behind: {collection} write concern error:", e.details.get("writeConcernErrors"))
+                    break
+                # Ordered: everything before the failed write is already in
+                first = write_errors[0]
+                index = start + first["index"]
+                if first.get("code") != 11000:      # 11000: inserted by an earlier attempt
+                    failed[index] = e
+                    self._spill(collection, items[index][1], first.get("errmsg"))
+                start, attempt = index + 1, 0
+            except Exception as e:
+                # Mongo unreachable - keep the writes, in order, until it is back
+                attempt += 1
+                with self._lock:
+                    self.retried += 1
+                if self._closed and attempt > self.retries:
+                    for index in range(start, len(items)):
+                        failed[index] = e
+                        self._spill(collection, items[index][1], str(e))
+                    break
+                if attempt == 1:
+                    print(f"❌ Write-behind: writes to {collection} failed, retrying:", e)
+                time.sleep(min(self.max_backoff, 0.1 * 2 ** attempt))
+        return failed
+
+    def _spill(self, collection, operation, error):
+        with self._lock:
+            self.rejected += 1
+        print(f"❌ Write-behind: write to {collection} not stored:", error)
+        if not self.spill_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(json_util.dumps({
+                    "collection": collection,
+                    "document": getattr(operation, "_doc", None),
+                    "error": error,
+                    "failedAt": datetime.utcnow(),
+                }) + "\n")
+        except Exception as e:
+            print("Write-behind: could not save failed write:", e)
+
+    def _write_batch(self, batch):
+        start = time.perf_counter()
+
+        # Group writes per collection, keeping submission order within each
+        groups = {}
+        for position, item in enumerate(batch):
+            if item[0] is not _FLUSH_MARKER:
+                groups.setdefault(item[0], []).append(position)
+
+        errors = {}
+        for collection, positions in groups.items():
+            failed = self._write_group(collection, [batch[p] for p in positions])
+            for index, error in failed.items():
+                errors[positions[index]] = error
+
+        with self._lock:
+            if groups:
+                self.batches += 1
+                self._flush_latencies.append(time.perf_counter() - start)
+            self.written += sum(len(p) for p in groups.values()) - len(errors)
+
+        for position, (collection, _, after, fut) in enumerate(batch):
+            error = errors.get(position)
+            if error is not None:
+                fut.set_exception(error)
+                continue
+            if after is not None:
+                try:
+                    after()
+                except Exception as e:
+                    print("Write-behind callback failed:", e)
+            fut.set_result(None)